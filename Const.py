@@ -1,6 +1,36 @@
 PLANILHA_TRILHAS = 'dados/trilhas_formativas.xlsx'
 PLANILHA_PRESENCA = 'dados/lista_presenca_trilhas_formativas.xlsx'
 
+# Vários períodos (semestres): cada período é uma pasta dentro de FONTE_PERIODOS com as duas planilhas acima, ou um
+# par de planilhas com o período no fim do nome (trilhas_formativas_2025-1.xlsx). FONTE_PERIODOS também pode ser um
+# padrão glob ('dados/20*'). Sem períodos encontrados, usa PLANILHA_TRILHAS e PLANILHA_PRESENCA (período PERIODO_UNICO).
+FONTE_PERIODOS = 'dados/periodos'
+PERIODO_ATUAL = None  # Período aberto ao iniciar; None = o último em ordem alfabética
+PERIODO_UNICO = 'atual'
+
+# Cache das planilhas processadas (Parquet, requer pyarrow)
+USAR_CACHE = True
+PASTA_CACHE = 'dados/.cache'
+
+# Armazenamento dos dados unificados: 'memoria' (quadros do pandas) ou 'sqlite'. Com 'sqlite', os dados são gravados
+# uma vez em ARQUIVO_BANCO (com índices) e as buscas viram consultas SQL; outras aberturas do programa, e outros
+# usuários com acesso ao arquivo, usam o banco sem reler o Excel enquanto as planilhas não mudarem.
+ARMAZENAMENTO = 'memoria'
+ARQUIVO_BANCO = 'dados/trilhas.sqlite'
+
+# Leitura das listas de presença linha a linha (openpyxl em modo somente leitura, ou python-calamine se instalado),
+# sem montar um DataFrame de cada aba inteira. Com False, usa pandas.read_excel.
+LEITURA_STREAMING_PRESENCA = True
+
+# Leitura das abas em paralelo (uma aba por processo)
+CARREGAMENTO_PARALELO = False
+PROCESSOS_CARREGAMENTO = None  # None = número de núcleos da máquina
+
+# Medição de desempenho das etapas de carregamento e das buscas (ver DataLoader.desempenho_carga)
+MEDIR_MEMORIA_ETAPAS = False  # Variação de memória por etapa (tracemalloc; deixa o carregamento mais lento)
+ARQUIVO_LOG_DESEMPENHO = None  # Ex.: 'dados/desempenho.jsonl' (uma linha JSON por etapa medida)
+LIMITE_REGISTROS_BUSCAS = 1000  # Buscas mais recentes mantidas em DataLoader.desempenho_buscas
+
 COLUNAS_ALUNOS = {
     'aluno': 'Aluno',
     'matricula': 'Matricula',
@@ -12,6 +42,34 @@ COLUNAS_ALUNOS = {
     'direcao': 'Direcao'
 }
 CAMPOS_BUSCA_DADOS = ["Aluno", "Matricula", "CPF", "Mae", "Pai", "Turma", "Telefone", "Escola"]
+CAMPOS_EXIBICAO_DADOS = ["Aluno", "Matricula", "CPF", "Mae", "Pai", "Turma", "Telefone", "Escola", "Direcao"]
+# Campos com índice exato (dicionário): um valor completo é encontrado direto, sem varrer a coluna;
+# a busca por trecho só roda se não houver correspondência exata
+CAMPOS_CHAVE_EXATA = ["Matricula", "CPF"]
+
+# Colunas guardadas como 'category' (códigos inteiros + um dicionário de valores) nos quadros unificados
+COLUNAS_CATEGORICAS_ALUNOS = ['Escola', 'Escola_Key', 'Turma', 'Direcao']
+COLUNAS_CATEGORICAS_PRESENCA = ['Matricula', 'Oficina', 'Escola', 'Aluno', 'Aluno_Normalized', 'Data_Oficina']
+
+# Correspondência aproximada entre os nomes digitados nas listas de presença e o cadastro (erros de digitação).
+# Similaridade de 0 a 1: acima de LIMIAR_SIMILARIDADE_NOMES (e sem outro candidato a menos de MARGEM_AMBIGUIDADE_NOMES)
+# o nome é associado automaticamente; a partir de LIMIAR_REVISAO_NOMES ele vai para a tabela de conciliação.
+CORRESPONDENCIA_APROXIMADA_NOMES = True
+LIMIAR_SIMILARIDADE_NOMES = 0.90
+LIMIAR_REVISAO_NOMES = 0.75
+MARGEM_AMBIGUIDADE_NOMES = 0.03
+
+# Análise de frequência (analise.py): alunos abaixo deste percentual numa oficina são listados como em risco,
+# e as frequências são agrupadas nestas faixas (%)
+LIMITE_FREQUENCIA_RISCO = 75.0
+FAIXAS_FREQUENCIA = [0, 25, 50, 75, 90, 100]
+
+# Exportação em lote (exportacao.py): um arquivo por escola, com as escolas distribuídas entre processos
+EXPORTACAO_PARALELA = True
+PROCESSOS_EXPORTACAO = None  # None = número de núcleos da máquina
+
+# Quantidade máxima de textos guardados no cache de normalização (LRU)
+TAMANHO_CACHE_NORMALIZACAO = 65536
 
 
 # Configurações da Interface
@@ -25,6 +83,22 @@ FONTE_PRINCIPAL = ('Helvetica', 10)
 JANELA_LARGURA = 800
 JANELA_ALTURA = 600
 IMAGEM_FUNDO = 'imagens_menu/fundo_menu.png'
+INTERVALO_VERIFICACAO_MS = 100  # Intervalo de leitura da fila de carregamento em segundo plano
+INTERVALO_VERIFICACAO_BUSCA_MS = 20  # Intervalo de verificação das buscas executadas em segundo plano
+ITENS_POR_PAGINA = 50  # Alunos (ou datas) exibidos por página nas áreas de resultado
+
+# Busca enquanto se digita: espera o usuário parar de digitar antes de pesquisar
+BUSCA_AO_DIGITAR = True
+ATRASO_BUSCA_DIGITACAO_MS = 250
+CARACTERES_MINIMOS_BUSCA_DIGITACAO = 2
+
+# Inicialização rápida: o menu aparece antes de importar pandas e ler as planilhas; a planilha de presença
+# só é lida quando a tela de frequência é aberta pela primeira vez
+CARREGAR_PRESENCA_SOB_DEMANDA = True
+
+# Recarrega automaticamente quando as planilhas de 'dados/' são salvas
+MONITORAR_PLANILHAS = False
+INTERVALO_MONITORAMENTO_MS = 5000
 
 # Mensagens de Erro
 ERRO_ARQUIVO_NAO_ENCONTRADO = "Erro: Um ou mais arquivos de planilha não foram encontrados. Verifique os caminhos 'dados/'."
@@ -0,0 +1,141 @@
+"""
+Indicadores gerais de frequência, calculados de uma vez sobre as tabelas já carregadas pelo DataLoader
+(DataLoader.participacoes e DataLoader.comparecimento_por_data, em memória ou no banco SQLite),
+sem precisar de uma busca por aluno ou oficina.
+
+As listas de presença só registram quem esteve presente: um aluno é considerado participante de uma oficina
+quando tem ao menos uma presença nela. Alunos que nunca compareceram a uma oficina não entram nos indicadores dela.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from Const import LIMITE_FREQUENCIA_RISCO, FAIXAS_FREQUENCIA
+
+
+class AnaliseFrequencia:
+    """
+    Médias por escola e por oficina, distribuição das frequências, comparecimento por data
+    e alunos abaixo de `limite` (% de frequência numa oficina).
+    Cada indicador é um DataFrame (ver tabelas()); o tempo de cada etapa vai para data_loader.desempenho_buscas.
+    """
+
+    def __init__(self, data_loader, limite=LIMITE_FREQUENCIA_RISCO):
+        self.limite = limite
+        medir = data_loader.desempenho_buscas.medir
+
+        with medir("análise: participações") as registro:
+            participacoes = self._participacoes(data_loader)
+            registro['linhas'] = len(participacoes)
+            participacoes['Abaixo_Limite'] = participacoes['Frequencia_Percentual'] < limite
+        self.participacoes = participacoes
+
+        with medir("análise: por escola", linhas=len(participacoes)):
+            self.por_escola = self._agregar(participacoes, 'Escola')
+        with medir("análise: por oficina", linhas=len(participacoes)):
+            self.por_oficina = self._agregar(participacoes, 'Oficina')
+            dias = data_loader.df_oficinas.set_index('Oficina')['Dias_Totais_Oficina']
+            self.por_oficina.insert(1, 'Dias_Totais_Oficina', self.por_oficina['Oficina'].map(dias).to_numpy())
+        with medir("análise: distribuição", linhas=len(participacoes)):
+            self.distribuicao = self._distribuicao(participacoes['Frequencia_Percentual'])
+        with medir("análise: comparecimento por data") as registro:
+            self.comparecimento = self._comparecimento(data_loader.comparecimento_por_data(), self.por_oficina)
+            registro['linhas'] = len(self.comparecimento)
+        with medir("análise: alunos em risco", linhas=len(participacoes)):
+            self.alunos_em_risco = participacoes[participacoes['Abaixo_Limite']].drop(
+                columns=['Abaixo_Limite']).sort_values(
+                ['Escola', 'Aluno', 'Frequencia_Percentual'], kind='stable').reset_index(drop=True)
+
+    @staticmethod
+    def _participacoes(data_loader):
+        """Uma linha por (aluno, oficina) com presença, com o nome e a escola do aluno."""
+        participacoes = data_loader.participacoes()
+        participacoes['Matricula'] = participacoes['Matricula'].astype(str)
+        participacoes['Oficina'] = participacoes['Oficina'].astype(str)
+
+        alunos = data_loader.alunos_com_matricula.drop_duplicates('Matricula').set_index('Matricula')
+        participacoes.insert(1, 'Aluno', participacoes['Matricula'].map(alunos['Aluno']).to_numpy())
+        participacoes.insert(2, 'Escola', participacoes['Matricula'].map(alunos['Escola'].astype(str)).to_numpy())
+        return participacoes
+
+    @staticmethod
+    def _agregar(participacoes, coluna):
+        """Médias e quantidade de alunos abaixo do limite, por escola ou por oficina."""
+        grupos = participacoes.groupby(coluna, sort=True)
+        agregado = grupos.agg(
+            Alunos=('Matricula', 'nunique'),
+            Participacoes=('Matricula', 'size'),
+            Presencas=('Presencas_Contadas', 'sum'),
+            Dias_Possiveis=('Dias_Totais_Oficina', 'sum'),
+            Frequencia_Media=('Frequencia_Percentual', 'mean'),
+            Frequencia_Mediana=('Frequencia_Percentual', 'median'),
+        )
+        # Frequência geral: presenças sobre dias possíveis (pondera as oficinas pelo número de dias)
+        agregado['Frequencia_Geral'] = agregado['Presencas'] / agregado['Dias_Possiveis'] * 100
+        agregado['Alunos_Abaixo_Limite'] = participacoes[participacoes['Abaixo_Limite']].groupby(
+            coluna)['Matricula'].nunique().reindex(agregado.index, fill_value=0)
+        agregado['Percentual_Abaixo_Limite'] = agregado['Alunos_Abaixo_Limite'] / agregado['Alunos'] * 100
+
+        colunas_percentuais = ['Frequencia_Media', 'Frequencia_Mediana', 'Frequencia_Geral', 'Percentual_Abaixo_Limite']
+        agregado[colunas_percentuais] = agregado[colunas_percentuais].round(1)
+        return agregado.drop(columns=['Presencas', 'Dias_Possiveis']).reset_index()
+
+    @staticmethod
+    def _distribuicao(frequencias):
+        """Quantidade de participações em cada faixa de FAIXAS_FREQUENCIA (a última faixa inclui os 100%)."""
+        limites = np.asarray(FAIXAS_FREQUENCIA, dtype=float)
+        faixas = [f"{inicio:g}% a {fim:g}%" for inicio, fim in zip(limites[:-1], limites[1:])]
+        posicoes = np.clip(np.searchsorted(limites, frequencias.to_numpy(), side='right') - 1, 0, len(faixas) - 1)
+        quantidades = np.bincount(posicoes, minlength=len(faixas))
+
+        total = quantidades.sum()
+        return pd.DataFrame({
+            'Faixa': faixas,
+            'Participacoes': quantidades,
+            'Percentual': (quantidades / total * 100).round(1) if total else 0.0,
+        })
+
+    @staticmethod
+    def _comparecimento(comparecimento, por_oficina):
+        """Alunos presentes em cada data de cada oficina, também em % dos participantes da oficina."""
+        comparecimento['Oficina'] = comparecimento['Oficina'].astype(str)
+        comparecimento['Data_Oficina'] = comparecimento['Data_Oficina'].astype(str)
+
+        participantes = por_oficina.set_index('Oficina')['Alunos']
+        comparecimento['Percentual_Participantes'] = (
+                comparecimento['Presentes'] / comparecimento['Oficina'].map(participantes) * 100).round(1)
+        return comparecimento.sort_values(['Oficina', 'Data', 'Data_Oficina'], kind='stable').reset_index(drop=True)
+
+    def tabelas(self):
+        """Indicadores na ordem de exibição e exportação: nome -> DataFrame."""
+        return {
+            'por_escola': self.por_escola,
+            'por_oficina': self.por_oficina,
+            'distribuicao': self.distribuicao,
+            'comparecimento': self.comparecimento,
+            'alunos_em_risco': self.alunos_em_risco,
+        }
+
+    def exportar(self, caminho):
+        """
+        Grava o relatório. Em .xlsx, uma aba por indicador; caso contrário, um arquivo por indicador
+        ao lado de `caminho` (relatorio.csv -> relatorio_por_escola.csv, ...), em CSV ou Parquet.
+        Devolve os arquivos gravados.
+        """
+        if caminho.lower().endswith('.xlsx'):
+            with pd.ExcelWriter(caminho) as writer:
+                for nome, df in self.tabelas().items():
+                    df.to_excel(writer, sheet_name=nome, index=False)
+            return [caminho]
+
+        base, extensao = os.path.splitext(caminho)
+        gravados = []
+        for nome, df in self.tabelas().items():
+            destino = f"{base}_{nome}{extensao or '.csv'}"
+            if destino.lower().endswith('.parquet'):
+                df.to_parquet(destino, index=False)
+            else:
+                df.to_csv(destino, index=False, encoding='utf-8-sig')
+            gravados.append(destino)
+        return gravados
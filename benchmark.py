@@ -0,0 +1,332 @@
+"""
+Benchmark do carregamento e das buscas com planilhas sintéticas (sem CPFs reais).
+
+Gera trilhas_formativas.xlsx e lista_presenca_trilhas_formativas.xlsx no formato das planilhas de 'dados/',
+com a quantidade de escolas, alunos, oficinas e datas escolhida, mede cada etapa do DataLoader e cada tipo de
+busca e grava os resultados em JSON para comparar execuções.
+
+Exemplos (executar na pasta do projeto):
+    python benchmark.py --escolas 20 --alunos-por-escola 500 --oficinas 30 --datas 40 --saida bench.json
+    python benchmark.py --saida bench_novo.json --comparar bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import data_loader
+from data_loader import DataLoader
+from Const import CAMPOS_BUSCA_DADOS, PLANILHA_TRILHAS, PLANILHA_PRESENCA
+
+PRIMEIROS_NOMES = ["Ana", "João", "Maria", "José", "Antônio", "Francisca", "Luíza", "Pedro", "Lúcia", "Carlos",
+                   "Érica", "Júlio", "Beatriz", "Gabriel", "Heloísa", "Ícaro", "Vitória", "Otávio", "Cauã", "Sofia"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Conceição", "Araújo", "Gonçalves", "Ribeiro", "Fernandes",
+              "Gomes", "Lopes", "Mendonça", "Assunção", "Brandão", "Magalhães", "Simões", "Frazão", "Estêvão"]
+OFICINAS = ["robotica", "programacao", "modelagem_3d", "educacao_financeira", "criacao_brinquedos", "teatro",
+            "musica", "xadrez", "fotografia", "jornalismo"]
+
+
+# GERAÇÃO DAS PLANILHAS SINTÉTICAS
+
+def gerar_nome(i, rng):
+    """Nome único e determinístico para o aluno i (com acentos, como nas planilhas reais)."""
+    partes = [PRIMEIROS_NOMES[i % len(PRIMEIROS_NOMES)]]
+    resto = i // len(PRIMEIROS_NOMES)
+    while True:
+        partes.append(SOBRENOMES[resto % len(SOBRENOMES)])
+        resto //= len(SOBRENOMES)
+        if resto == 0:
+            break
+    nome = ' '.join(partes)
+    return nome.upper() if rng.random() < 0.5 else nome
+
+
+def gerar_planilhas(pasta, escolas, alunos_por_escola, oficinas, datas, taxa_presenca, seed):
+    """Grava as duas planilhas em <pasta>/dados/ e devolve a lista de alunos gerados."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(pasta, 'dados'), exist_ok=True)
+
+    alunos = []
+    wb = Workbook(write_only=True)
+    for e in range(escolas):
+        ws = wb.create_sheet(f"escola_{e:03d}_são_josé")
+        ws.append(["Aluno", "Matricula", "CPF", "Mae", "Pai", "Turma", "Telefone", "Direcao"])
+        for a in range(alunos_por_escola):
+            i = e * alunos_por_escola + a
+            nome = gerar_nome(i, rng)
+            alunos.append(nome)
+            ws.append([
+                nome,
+                f"{2025000000 + i}",
+                f"{rng.randrange(10 ** 11):011d}",
+                f"Mãe de {nome.split()[0]}",
+                f"Pai de {nome.split()[-1]}" if rng.random() < 0.8 else None,
+                f"{rng.randint(6, 9)}º {rng.choice('ABCD')}",
+                f"(81) 9{rng.randrange(10 ** 8):08d}",
+                "Direção Escolar"
+            ])
+    wb.save(os.path.join(pasta, PLANILHA_TRILHAS))
+
+    wb = Workbook(write_only=True)
+    inicio = date(2025, 3, 3)
+    for o in range(oficinas):
+        nome_oficina = OFICINAS[o % len(OFICINAS)] + (f"_{o // len(OFICINAS)}" if o >= len(OFICINAS) else "")
+        ws = wb.create_sheet(nome_oficina)
+        inscritos = rng.sample(alunos, min(len(alunos), max(1, len(alunos) // max(1, oficinas // 3))))
+
+        colunas = []
+        for d in range(datas):
+            presentes = [nome for nome in inscritos if rng.random() < taxa_presenca]
+            colunas.append(presentes)
+
+        ws.append([datetime.combine(inicio + timedelta(days=7 * d), datetime.min.time()) for d in range(datas)])
+        for linha in range(max((len(c) for c in colunas), default=0)):
+            ws.append([c[linha] if linha < len(c) else None for c in colunas])
+    wb.save(os.path.join(pasta, PLANILHA_PRESENCA))
+
+    return alunos
+
+
+# MEDIÇÕES
+
+def medir(funcao, repeticoes, preparar=None):
+    """Executa `funcao` várias vezes e devolve (tempos em segundos, último resultado)."""
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, resultado
+
+
+def pico_memoria(funcao, preparar=None):
+    """Pico de memória alocada (MB) durante uma execução de `funcao`, medido com tracemalloc."""
+    if preparar is not None:
+        preparar()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 1024 ** 2
+
+
+def registro(etapa, tempos, linhas=None, memoria_mb=None):
+    return {
+        'etapa': etapa,
+        'repeticoes': len(tempos),
+        'tempo_min_s': min(tempos),
+        'tempo_mediana_s': statistics.median(tempos),
+        'linhas': linhas,
+        'pico_memoria_mb': memoria_mb
+    }
+
+
+def loader_sem_cache():
+    # Cada execução "fria" começa sem o cache LRU de normalização
+    data_loader._normalize_str.cache_clear()
+    loader = DataLoader()
+    loader.cache = None
+    return loader
+
+
+def executar_benchmark(args):
+    resultados = []
+    estado = {}
+
+    def novo_loader():
+        estado['loader'] = loader_sem_cache()
+
+    # Etapas do carregamento, isoladas
+    def etapa_trilhas():
+        estado['loader'].df_alunos = estado['loader']._load_trilhas_formativas()
+        return estado['loader'].df_alunos
+
+    tempos, df_alunos = medir(etapa_trilhas, args.repeticoes, preparar=novo_loader)
+    resultados.append(registro('carregar_trilhas', tempos, len(df_alunos),
+                               pico_memoria(etapa_trilhas, preparar=novo_loader) if args.memoria else None))
+
+    tempos, _ = medir(lambda: estado['loader']._construir_indice_alunos(), args.repeticoes)
+    resultados.append(registro('indice_busca_cadastral', tempos, len(df_alunos)))
+
+    alunos_validos = df_alunos[df_alunos['Aluno_Normalized'] != ''].copy()
+
+    def etapa_presenca():
+        return estado['loader']._load_presenca_trilhas(alunos_validos)
+
+    tempos, df_presenca = medir(etapa_presenca, args.repeticoes, preparar=novo_loader)
+    resultados.append(registro('carregar_presenca', tempos, len(df_presenca),
+                               pico_memoria(etapa_presenca, preparar=novo_loader) if args.memoria else None))
+
+    # Carga completa: sem cache, com cache em disco frio/quente e recarga sem alterações
+    def carga_completa():
+        estado['loader'].load_data()
+        return estado['loader']
+
+    tempos, loader = medir(carga_completa, args.repeticoes, preparar=novo_loader)
+    resultados.append(registro('load_data_sem_cache', tempos, len(loader.df_presenca_completa),
+                               pico_memoria(carga_completa, preparar=novo_loader) if args.memoria else None))
+
+    # Detalhamento da última carga sem cache, etapa por etapa (ver DataLoader.desempenho_carga)
+    for etapa in loader.desempenho_carga.etapas:
+        resultados.append(registro(f"etapa/{etapa['etapa']}", [etapa['tempo_s']], etapa['linhas']))
+
+    def loader_com_cache():
+        data_loader._normalize_str.cache_clear()
+        estado['loader'] = DataLoader()
+
+    shutil.rmtree(data_loader.PASTA_CACHE, ignore_errors=True)  # A mesma pasta que o CacheDados do DataLoader() usa
+    tempos, _ = medir(carga_completa, 1, preparar=loader_com_cache)
+    resultados.append(registro('load_data_gravando_cache', tempos, len(estado['loader'].df_presenca_completa)))
+
+    tempos, _ = medir(carga_completa, args.repeticoes, preparar=loader_com_cache)
+    resultados.append(registro('load_data_cache_quente', tempos, len(estado['loader'].df_presenca_completa)))
+
+    tempos, _ = medir(carga_completa, args.repeticoes)
+    resultados.append(registro('recarregar_sem_alteracoes', tempos, len(estado['loader'].df_presenca_completa)))
+
+    # Buscas (a parte de dados de DadosAlunosFrame/PorcentagensFrame.perform_search)
+    loader = estado['loader']
+    rng = random.Random(args.seed)
+    amostra = loader.df_alunos.sample(min(args.consultas, len(loader.df_alunos)), random_state=args.seed)
+
+    for campo in CAMPOS_BUSCA_DADOS:
+        coluna = 'Escola_Key' if campo == "Escola" else campo
+        if coluna not in amostra.columns:
+            continue
+        valores = [str(v) for v in amostra[coluna].dropna()]
+        termos = [v[rng.randrange(max(1, len(v) - 4)):][:5] for v in valores if v]
+        tempos = [medir(lambda t=termo: loader.buscar_alunos(campo, t), 1)[0][0] for termo in termos]
+        if tempos:
+            resultados.append(registro(f'busca_cadastral_{campo}', tempos))
+
+    oficinas = list(loader.df_oficinas['Oficina']) if loader.has_presenca() else []
+    consultas_frequencia = {
+        'Aluno': [str(nome).split()[0] + ' ' + str(nome).split()[-1] for nome in amostra['Aluno'].dropna()],
+        'Matricula': list(amostra['Matricula']),
+        'Oficina': oficinas[:args.consultas]
+    }
+    for campo, termos in consultas_frequencia.items():
+        def busca_frequencia(termo, campo=campo):
+            df_alunos_filtrados, df_oficinas_filtradas = loader.filtrar_frequencia(campo, termo)
+            df_group = loader.calcular_frequencia(df_alunos_filtrados, df_oficinas_filtradas)
+            if campo == "Oficina":
+                loader.presentes_por_data(df_oficinas_filtradas['Oficina'])
+            return df_group
+
+        tempos = [medir(lambda t=termo: busca_frequencia(t), 1)[0][0] for termo in termos]
+        if tempos:
+            resultados.append(registro(f'busca_frequencia_{campo}', tempos))
+
+    tempos, df_todos = medir(loader.calcular_frequencia, args.repeticoes)
+    resultados.append(registro('frequencia_todos_alunos', tempos, len(df_todos)))
+
+    return resultados
+
+
+def comparar(resultados, caminho_anterior, tolerancia):
+    """Imprime a variação de cada etapa em relação a uma execução anterior; devolve as etapas que pioraram."""
+    with open(caminho_anterior, encoding='utf-8') as f:
+        anteriores = {r['etapa']: r for r in json.load(f)['resultados']}
+
+    regressoes = []
+    for r in resultados:
+        anterior = anteriores.get(r['etapa'])
+        if not anterior or not anterior['tempo_mediana_s']:
+            continue
+        razao = r['tempo_mediana_s'] / anterior['tempo_mediana_s']
+        marca = "  <-- REGRESSÃO" if razao > tolerancia else ""
+        print(f"{r['etapa']:32s} {anterior['tempo_mediana_s']:9.4f} s -> {r['tempo_mediana_s']:9.4f} s "
+              f"({razao:5.2f}x){marca}")
+        if razao > tolerancia:
+            regressoes.append(r['etapa'])
+    return regressoes
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Benchmark do carregamento e das buscas com planilhas sintéticas.")
+    parser.add_argument('--escolas', type=int, default=10)
+    parser.add_argument('--alunos-por-escola', type=int, default=300)
+    parser.add_argument('--oficinas', type=int, default=12)
+    parser.add_argument('--datas', type=int, default=30, help="Datas (colunas) por oficina.")
+    parser.add_argument('--taxa-presenca', type=float, default=0.75)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--consultas', type=int, default=50, help="Consultas por tipo de busca.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sem-memoria', dest='memoria', action='store_false',
+                        help="Não mede o pico de memória (evita uma execução extra de cada carga).")
+    parser.add_argument('--pasta', help="Onde gerar as planilhas (padrão: pasta temporária, apagada ao final).")
+    parser.add_argument('--saida', default='bench_resultados.json', help="Arquivo JSON com os resultados.")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar.")
+    parser.add_argument('--tolerancia', type=float, default=1.25,
+                        help="Razão de tempo acima da qual uma etapa é considerada regressão.")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    saida = os.path.abspath(args.saida)
+    comparar_com = os.path.abspath(args.comparar) if args.comparar else None
+
+    pasta = args.pasta or tempfile.mkdtemp(prefix='bench_trilhas_')
+    diretorio_original = os.getcwd()
+    try:
+        inicio = time.perf_counter()
+        alunos = gerar_planilhas(pasta, args.escolas, args.alunos_por_escola, args.oficinas, args.datas,
+                                 args.taxa_presenca, args.seed)
+        print(f"Planilhas sintéticas geradas em {pasta} ({len(alunos)} alunos) em "
+              f"{time.perf_counter() - inicio:.1f} s")
+
+        # Os caminhos de Const.py são relativos à pasta atual
+        os.chdir(pasta)
+        resultados = executar_benchmark(args)
+    finally:
+        os.chdir(diretorio_original)
+        if not args.pasta:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    relatorio = {
+        'data_execucao': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('saida', 'comparar', 'pasta')},
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'resultados': resultados
+    }
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    for r in resultados:
+        memoria = f"  pico {r['pico_memoria_mb']:.1f} MB" if r['pico_memoria_mb'] is not None else ""
+        print(f"{r['etapa']:32s} mediana {r['tempo_mediana_s']:9.4f} s  (mín {r['tempo_min_s']:.4f} s){memoria}")
+    print(f"Resultados gravados em {saida}")
+
+    if comparar_com:
+        regressoes = comparar(resultados, comparar_com, args.tolerancia)
+        if regressoes:
+            print(f"{len(regressoes)} etapa(s) acima da tolerância de {args.tolerancia:.2f}x.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Linha de comando das Trilhas Formativas, para relatórios agendados e scripts.
+Usa a mesma camada de dados da interface (data_loader.py), sem importar tkinter nem Pillow.
+
+Exemplos (executar na pasta do projeto):
+    python cli.py frequencia --saida frequencia.csv
+    python cli.py frequencia --busca-por Oficina --valor robotica --saida robotica.parquet
+    python cli.py frequencia --busca-por Matricula --valor M123 --periodos todos --saida historico.csv
+    python cli.py --periodo 2024-2 buscar Aluno "maria"
+    python cli.py periodos
+    python cli.py buscar Aluno "maria"
+    python cli.py conciliacao --saida conciliacao.csv
+    python cli.py analise --saida analise.xlsx --limite 75
+    python cli.py exportar --pasta por_escola --formato xlsx
+    python cli.py tempos
+    python cli.py tempos --perfil carga.prof
+"""
+import argparse
+import sys
+import time
+
+_inicio_importacao = time.perf_counter()
+from data_loader import CatalogoPeriodos
+from analise import AnaliseFrequencia
+from exportacao import exportar_por_escola
+from Const import CAMPOS_BUSCA_DADOS, CAMPOS_EXIBICAO_DADOS, LIMITE_FREQUENCIA_RISCO, FONTE_PERIODOS
+_tempo_importacao = time.perf_counter() - _inicio_importacao
+
+
+def escolher_periodo(catalogo, periodo):
+    """Valida o período pedido (None = o período atual); encerra com código 1 se ele não existir."""
+    periodo = periodo or catalogo.atual()
+    if periodo not in catalogo.planilhas:
+        print(f"Período desconhecido: {periodo}. Disponíveis: {', '.join(catalogo.periodos)}", file=sys.stderr)
+        sys.exit(1)
+    return periodo
+
+
+def carregar_dados(periodo=None, progresso=None, perfil=None):
+    """Carrega as planilhas do período; encerra com código 1 se não houver dados utilizáveis."""
+    catalogo = CatalogoPeriodos()
+    data_loader = catalogo.carregador(escolher_periodo(catalogo, periodo))
+    data_loader.load_data(progresso=progresso, perfil=perfil)
+
+    if not data_loader.is_loaded:
+        print(data_loader.error_message, file=sys.stderr)
+        sys.exit(1)
+    if data_loader.error_message:
+        print(f"Aviso: {data_loader.error_message}", file=sys.stderr)
+
+    return data_loader
+
+
+def salvar_tabela(df, caminho):
+    """Grava em Parquet se o arquivo terminar em .parquet; caso contrário, em CSV (UTF-8 com BOM, para o Excel)."""
+    if caminho.lower().endswith('.parquet'):
+        df.to_parquet(caminho, index=False)
+    else:
+        df.to_csv(caminho, index=False, encoding='utf-8-sig')
+
+
+def comando_frequencia(args):
+    if args.periodos:
+        return comando_frequencia_periodos(args)
+
+    data_loader = carregar_dados(args.periodo)
+
+    if not data_loader.has_presenca():
+        print("Erro: Nenhum dado de presença carregado.", file=sys.stderr)
+        return 1
+
+    if args.valor:
+        df_alunos, df_oficinas = data_loader.filtrar_frequencia(args.busca_por, args.valor)
+    else:
+        df_alunos, df_oficinas = None, None
+
+    df_frequencia = data_loader.calcular_frequencia(df_alunos, df_oficinas)
+    df_frequencia['Dias_Presentes'] = df_frequencia['Dias_Presentes'].map(', '.join)
+
+    df_frequencia = df_frequencia[['Matricula', 'Aluno', 'Escola', 'Oficina', 'Dias_Totais_Oficina',
+                                   'Presencas_Contadas', 'Frequencia_Percentual', 'Dias_Presentes']]
+
+    salvar_tabela(df_frequencia, args.saida)
+    print(f"{len(df_frequencia)} linhas gravadas em {args.saida}")
+    return 0
+
+
+def comando_frequencia_periodos(args):
+    """Frequência em vários períodos, com a coluna Periodo (cada período é lido só uma vez)."""
+    catalogo = CatalogoPeriodos()
+    if args.periodos == 'todos':
+        periodos = catalogo.periodos
+    else:
+        periodos = [escolher_periodo(catalogo, periodo.strip()) for periodo in args.periodos.split(',')]
+
+    df_frequencia = catalogo.frequencia(args.busca_por, args.valor, periodos)
+    if df_frequencia.empty:
+        print("Erro: Nenhum dado de presença carregado.", file=sys.stderr)
+        return 1
+
+    df_frequencia['Dias_Presentes'] = df_frequencia['Dias_Presentes'].map(', '.join)
+    df_frequencia = df_frequencia[['Periodo', 'Matricula', 'Aluno', 'Escola', 'Oficina', 'Dias_Totais_Oficina',
+                                   'Presencas_Contadas', 'Frequencia_Percentual', 'Dias_Presentes']]
+
+    salvar_tabela(df_frequencia, args.saida)
+    print(f"{len(df_frequencia)} linhas ({len(periodos)} período(s)) gravadas em {args.saida}")
+    return 0
+
+
+def comando_periodos(args):
+    catalogo = CatalogoPeriodos()
+    if not catalogo.particionado:
+        print(f"Nenhum período encontrado em '{FONTE_PERIODOS}'; usando as planilhas de 'dados/'.")
+    for periodo, planilhas in catalogo.planilhas.items():
+        marcador = "*" if periodo == catalogo.atual() else " "
+        print(f"{marcador} {periodo}: {planilhas[0]} | {planilhas[1]}")
+    return 0
+
+
+def comando_buscar(args):
+    data_loader = carregar_dados(args.periodo)
+    df_filtered = data_loader.buscar_alunos(args.campo, args.valor)
+
+    if args.saida:
+        salvar_tabela(df_filtered[[c for c in CAMPOS_EXIBICAO_DADOS if c in df_filtered.columns]], args.saida)
+        print(f"{len(df_filtered)} alunos gravados em {args.saida}")
+        return 0
+
+    if df_filtered.empty:
+        print(f"Nenhum aluno encontrado para '{args.valor}' no campo '{args.campo}'.")
+        return 0
+
+    print(f"--- Encontrados {len(df_filtered)} alunos com '{args.valor}' ---\n")
+    for index, row in df_filtered.iterrows():
+        print(f"--- Aluno {index + 1} (Matrícula: {row['Matricula']})---")
+        for field in CAMPOS_EXIBICAO_DADOS:
+            if field in row:
+                print(f"{field}: {row[field]}")
+        print()
+    return 0
+
+
+def comando_conciliacao(args):
+    data_loader = carregar_dados(args.periodo)
+    df_conciliacao = data_loader.df_conciliacao_nomes
+
+    if df_conciliacao.empty:
+        print("Todos os nomes das listas de presença correspondem exatamente ao cadastro.")
+        return 0
+
+    salvar_tabela(df_conciliacao, args.saida)
+    for situacao, quantidade in df_conciliacao['Situacao'].value_counts().items():
+        print(f"{situacao}: {quantidade}")
+    print(f"{len(df_conciliacao)} nomes gravados em {args.saida}")
+    return 0
+
+
+def comando_analise(args):
+    data_loader = carregar_dados(args.periodo)
+
+    if not data_loader.has_presenca():
+        print("Erro: Nenhum dado de presença carregado.", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    analise = AnaliseFrequencia(data_loader, args.limite)
+    tempo = time.perf_counter() - inicio
+
+    print(analise.por_escola.to_string(index=False))
+    print()
+    print(f"{len(analise.alunos_em_risco)} participações abaixo de {args.limite:g}% (análise em {tempo:.3f} s)")
+    for caminho in analise.exportar(args.saida):
+        print(f"Gravado: {caminho}")
+    return 0
+
+
+def comando_exportar(args):
+    data_loader = carregar_dados(args.periodo)
+
+    if not data_loader.has_presenca():
+        print("Erro: Nenhum dado de presença carregado.", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    gravados = exportar_por_escola(data_loader, args.pasta, args.formato, args.limite)
+    print(f"{len(gravados)} arquivos gravados em {args.pasta} ({time.perf_counter() - inicio:.3f} s)")
+    return 0
+
+
+def comando_tempos(args):
+    eventos = []
+    inicio = time.perf_counter()
+    data_loader = carregar_dados(
+        args.periodo,
+        progresso=lambda evento, texto, percentual: eventos.append((time.perf_counter() - inicio, texto)),
+        perfil=args.perfil)
+    total = time.perf_counter() - inicio
+
+    print(f"Importação da camada de dados: {_tempo_importacao:.3f} s")
+    anterior = 0.0
+    for instante, texto in eventos:
+        print(f"  {instante - anterior:8.3f} s  {texto}")
+        anterior = instante
+    print(f"Carregamento total: {total:.3f} s")
+    print("\nEtapas:")
+    print(data_loader.desempenho_carga.resumo())
+    print()
+    for parte, abas in data_loader.abas_relidas.items():
+        print(f"Abas lidas do Excel ({parte}): {len(abas)} de {len(data_loader.abas[parte])}")
+    print(f"Alunos: {len(data_loader.df_alunos)} | Registros de presença: {data_loader.total_presencas()}")
+    print("\nMemória dos quadros:")
+    print(data_loader.relatorio_memoria().to_string(index=False, float_format=lambda mb: f"{mb:.2f}"))
+    if args.perfil:
+        print(f"Estatísticas do cProfile gravadas em {args.perfil}")
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Relatórios das Trilhas Formativas sem interface gráfica.")
+    parser.add_argument('--periodo', help="Período consultado (ver o comando 'periodos'); padrão: o atual.")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_freq = subparsers.add_parser('frequencia', help="Exporta a frequência de todos os alunos em todas as oficinas.")
+    p_freq.add_argument('--saida', required=True, help="Arquivo de saída (.csv ou .parquet).")
+    p_freq.add_argument('--busca-por', choices=["Aluno", "Matricula", "Oficina"], default="Aluno",
+                        help="Campo usado para filtrar (com --valor).")
+    p_freq.add_argument('--valor', help="Exporta só os alunos/oficinas que contêm este texto.")
+    p_freq.add_argument('--periodos', help="Vários períodos separados por vírgula, ou 'todos' (acrescenta a coluna Periodo).")
+    p_freq.set_defaults(func=comando_frequencia)
+
+    p_buscar = subparsers.add_parser('buscar', help="Busca cadastral de alunos.")
+    p_buscar.add_argument('campo', choices=CAMPOS_BUSCA_DADOS)
+    p_buscar.add_argument('valor')
+    p_buscar.add_argument('--saida', help="Grava o resultado (.csv ou .parquet) em vez de imprimir.")
+    p_buscar.set_defaults(func=comando_buscar)
+
+    p_conciliacao = subparsers.add_parser(
+        'conciliacao', help="Exporta os nomes da presença sem correspondência exata no cadastro.")
+    p_conciliacao.add_argument('--saida', required=True, help="Arquivo de saída (.csv ou .parquet).")
+    p_conciliacao.set_defaults(func=comando_conciliacao)
+
+    p_analise = subparsers.add_parser(
+        'analise', help="Exporta médias por escola e oficina, distribuição, comparecimento e alunos em risco.")
+    p_analise.add_argument('--saida', required=True,
+                           help="Arquivo .xlsx (uma aba por indicador) ou .csv/.parquet (um arquivo por indicador).")
+    p_analise.add_argument('--limite', type=float, default=LIMITE_FREQUENCIA_RISCO,
+                           help="Frequência (%%) abaixo da qual o aluno é listado como em risco.")
+    p_analise.set_defaults(func=comando_analise)
+
+    p_exportar = subparsers.add_parser(
+        'exportar', help="Grava um arquivo por escola com a frequência e o resumo de cada aluno.")
+    p_exportar.add_argument('--pasta', required=True, help="Pasta onde os arquivos são gravados.")
+    p_exportar.add_argument('--formato', choices=['xlsx', 'csv'], default='xlsx',
+                            help="xlsx (abas Frequencia e Resumo por aluno) ou csv (dois arquivos por escola).")
+    p_exportar.add_argument('--limite', type=float, default=LIMITE_FREQUENCIA_RISCO,
+                            help="Frequência (%%) abaixo da qual a oficina conta como abaixo do limite no resumo.")
+    p_exportar.set_defaults(func=comando_exportar)
+
+    p_periodos = subparsers.add_parser('periodos', help="Lista os períodos encontrados (* = o atual).")
+    p_periodos.set_defaults(func=comando_periodos)
+
+    p_tempos = subparsers.add_parser('tempos', help="Mede o tempo de carregamento das planilhas.")
+    p_tempos.add_argument('--perfil', help="Executa a carga sob o cProfile e grava as estatísticas neste arquivo.")
+    p_tempos.set_defaults(func=comando_tempos)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1807 @@
+"""
+Camada de dados das Trilhas Formativas: leitura das planilhas, cache, índices de busca e cálculo de frequência.
+Não depende de tkinter nem de Pillow, então pode ser usada pela interface (main_app.py) e pela linha de comando (cli.py).
+"""
+import os
+import re
+import glob
+import json
+import sqlite3
+import hashlib
+import zipfile
+from xml.etree import ElementTree
+import unicodedata
+import time
+import tracemalloc
+import cProfile
+import importlib.util
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+from Const import *
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+    from difflib import SequenceMatcher
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# O cache em Parquet (CacheDados) depende do pyarrow; sem ele, o cache fica desativado
+PYARROW_DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+
+
+# FUNÇÕES AUXILIARES
+
+@lru_cache(maxsize=TAMANHO_CACHE_NORMALIZACAO)
+def _normalize_str(text_str):
+    normalized = unicodedata.normalize('NFD', text_str.strip()).encode('ascii', 'ignore').decode("utf-8")
+    normalized = ' '.join(normalized.split())
+    return normalized.lower()
+
+
+def normalize_text(text):
+    """
+    Remove acentos, converte para minúsculas, remove espaços extras e trata NaN/None.
+    É crucial para a busca de alunos e escolas.
+    Os resultados ficam num cache LRU indexado pelo texto original (ver normalize_cache_info).
+    """
+    if pd.isna(text) or text is None:
+        return ""
+
+    try:
+        text_str = str(text)
+    except Exception:
+        return ""
+
+    return _normalize_str(text_str)
+
+
+def normalize_many(values):
+    """
+    Versão em lote de normalize_text para listas, arrays ou Series.
+    Cada valor distinto é normalizado uma única vez. Devolve um array numpy (dtype object).
+    """
+    serie = pd.Series(values, dtype=object) if not isinstance(values, pd.Series) else values.astype(object)
+    resultado = np.full(len(serie), "", dtype=object)
+
+    preenchidos = serie.notna().to_numpy()
+    if not preenchidos.any():
+        return resultado
+
+    # Deduplica pelo texto (e não pelo valor), para que 1 e 1.0 continuem distintos
+    codigos, unicos = pd.factorize(serie[preenchidos].map(str).to_numpy(dtype=object))
+    normalizados = np.array([_normalize_str(texto) for texto in unicos], dtype=object)
+    resultado[preenchidos] = normalizados[codigos]
+
+    return resultado
+
+
+def normalize_series(serie):
+    """Aplica normalize_many a uma Series, preservando o índice."""
+    return pd.Series(normalize_many(serie), index=serie.index, name=serie.name)
+
+
+def normalizar_cpf(valor):
+    """
+    Forma canônica de um CPF da planilha: só os dígitos, com os zeros à esquerda que o Excel perde
+    quando o CPF é gravado como número. Valores vazios viram "".
+    """
+    if pd.isna(valor):
+        return ""
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        if float(valor).is_integer():
+            return str(int(valor)).zfill(11)
+    return re.sub(r'\D', '', str(valor))
+
+
+def chave_busca(campo, valor):
+    """
+    Normaliza um termo de busca do mesmo modo que as colunas indexadas: CPFs digitados com pontos e
+    traço viram só dígitos; os demais campos passam por normalize_text.
+    """
+    if campo == "CPF":
+        digitos = re.sub(r'\D', '', str(valor))
+        if digitos:
+            return digitos
+    return normalize_text(valor)
+
+
+def indice_exato(chaves):
+    """Dicionário chave -> posições (ordenadas) das linhas com essa chave; chaves vazias ficam de fora."""
+    chaves = pd.Series(chaves, dtype=object).reset_index(drop=True)
+    indice = chaves.groupby(chaves.to_numpy(), sort=False).indices
+    indice.pop("", None)
+    return indice
+
+
+def normalize_cache_info():
+    """Estatísticas do cache de normalização (hits, misses, maxsize, currsize)."""
+    return _normalize_str.cache_info()
+
+
+def compactar_colunas(df, colunas):
+    """
+    Converte as colunas de texto repetitivo em 'category' (códigos inteiros + valores distintos).
+    As categorias ficam em ordem alfabética, então ordenações e agrupamentos dão o mesmo resultado que com texto.
+    """
+    return df.astype({coluna: 'category' for coluna in colunas if coluna in df.columns})
+
+
+def datas_reais(rotulos):
+    """
+    Converte os rótulos das datas das listas de presença ('2025-10-30 00:00:00', '30/10/2025'...) em datetime64;
+    rótulos que não são datas viram NaT. Cada rótulo distinto é convertido uma única vez.
+    """
+    rotulos = rotulos.astype('category')
+    textos = pd.Series(rotulos.cat.categories.astype(object))
+    # ISO primeiro (cabeçalhos de data do Excel): com dayfirst, '2025-03-10' viraria 3 de outubro
+    categorias = pd.to_datetime(textos, errors='coerce', format='ISO8601')
+    faltantes = categorias.isna()
+    if faltantes.any():
+        categorias[faltantes] = pd.to_datetime(textos[faltantes], errors='coerce', format='mixed', dayfirst=True)
+    return pd.Series(categorias.to_numpy()[rotulos.cat.codes.to_numpy()], index=rotulos.index).where(
+        rotulos.cat.codes.to_numpy() >= 0)
+
+
+def memoria_mb(df):
+    """Memória ocupada por um DataFrame (incluindo os textos), em MB."""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+# CORRESPONDÊNCIA APROXIMADA DE NOMES
+
+_REGRAS_FONETICAS = [
+    (r'ph', 'f'), (r'[sc]h|x', 'x'), (r'lh', 'l'), (r'nh', 'n'), (r'y', 'i'), (r'w', 'v'), (r'h', ''),
+    (r'c(?=[ei])', 's'), (r'g(?=[ei])', 'j'), (r'qu|c|q|k', 'k'), (r'z|ss', 's'), (r'(.)\1+', r'\1'),
+]
+
+
+def chave_fonetica(palavra):
+    """
+    Chave fonética simplificada (para o português) de uma palavra já normalizada: grafias que soam igual,
+    como 'luiz'/'luis' ou 'thiago'/'tiago', ficam com a mesma chave. Mantém a primeira letra e descarta as vogais.
+    """
+    for padrao, troca in _REGRAS_FONETICAS:
+        palavra = re.sub(padrao, troca, palavra)
+    return palavra[:1] + re.sub(r'[aeiou]', '', palavra[1:])
+
+
+def similaridade_nomes(nome_a, nome_b):
+    """Similaridade de 0 a 1 entre dois nomes normalizados, sem depender da ordem das palavras."""
+    if fuzz is not None:
+        return fuzz.token_sort_ratio(nome_a, nome_b) / 100
+    return SequenceMatcher(None, ' '.join(sorted(nome_a.split())), ' '.join(sorted(nome_b.split()))).ratio()
+
+
+def _chaves_bloco(nome):
+    """
+    Chaves de bloqueio de um nome: só são comparados nomes que compartilham alguma delas, em vez de todos
+    contra todos. Além do nome completo, cada chave omite uma das palavras, de modo que um erro de digitação
+    (ou uma palavra a mais ou a menos) numa única palavra preserva ao menos uma chave em comum;
+    a chave fonética cobre grafias diferentes que soam igual.
+    """
+    partes = tuple(nome.split())
+    if not partes:
+        return set()
+    chaves = {('nome', partes), ('fonetica', tuple(chave_fonetica(parte) for parte in partes))}
+    if len(partes) > 1:
+        chaves.update(('nome', partes[:i] + partes[i + 1:]) for i in range(len(partes)))
+    return chaves
+
+
+def conciliar_nomes(nomes_presenca, nomes_cadastro):
+    """
+    Procura, para cada nome da lista de presença sem correspondência exata no cadastro, o nome cadastrado mais
+    parecido entre os candidatos do mesmo bloco (ver _chaves_bloco).
+    Devolve (associacoes, conciliacao): associacoes = {nome da presença: nome do cadastro} com as correspondências
+    seguras (LIMIAR_SIMILARIDADE_NOMES, sem empate dentro de MARGEM_AMBIGUIDADE_NOMES); conciliacao = uma linha
+    por nome sem correspondência exata, com o melhor candidato, a similaridade e a situação.
+    """
+    cadastrados = set(nomes_cadastro)
+    blocos = {}
+    for nome in cadastrados:
+        for chave in _chaves_bloco(nome):
+            blocos.setdefault(chave, []).append(nome)
+
+    associacoes = {}
+    linhas = []
+    for nome in sorted(set(nomes_presenca) - cadastrados):
+        if not nome:
+            continue
+
+        candidatos = set()
+        for chave in _chaves_bloco(nome):
+            candidatos.update(blocos.get(chave, ()))
+
+        # Nomes de tamanho muito diferente não chegam ao limiar de revisão; nem precisam ser comparados
+        tamanho = len(nome)
+        candidatos = [candidato for candidato in candidatos
+                      if 2 * min(tamanho, len(candidato)) / (tamanho + len(candidato)) >= LIMIAR_REVISAO_NOMES]
+
+        pontuados = sorted(((similaridade_nomes(nome, candidato), candidato) for candidato in candidatos),
+                           key=lambda item: (-item[0], item[1]))
+        melhor, candidato = pontuados[0] if pontuados else (0.0, "")
+        segundo = pontuados[1][0] if len(pontuados) > 1 else 0.0
+
+        if melhor >= LIMIAR_SIMILARIDADE_NOMES and melhor - segundo >= MARGEM_AMBIGUIDADE_NOMES:
+            situacao = "Associado automaticamente"
+            associacoes[nome] = candidato
+        elif melhor >= LIMIAR_REVISAO_NOMES:
+            situacao = "Ambíguo (revisar)"
+        else:
+            situacao = "Sem correspondência"
+            candidato = ""
+
+        linhas.append({
+            'Nome_Presenca': nome,
+            'Candidato_Cadastro': candidato,
+            'Similaridade': round(melhor, 3),
+            'Segundo_Candidato': round(segundo, 3),
+            'Situacao': situacao
+        })
+
+    conciliacao = pd.DataFrame(linhas, columns=['Nome_Presenca', 'Candidato_Cadastro', 'Similaridade',
+                                                'Segundo_Candidato', 'Situacao'])
+    return associacoes, conciliacao
+
+
+# LEITURA DAS ABAS
+# Funções de módulo (e não métodos) para poderem ser executadas em outros processos.
+
+def ler_aba_alunos(fonte, sheet_name):
+    """Lê a aba de uma escola na planilha cadastral e padroniza as colunas."""
+    col_map_lower = {k.lower(): v for k, v in COLUNAS_ALUNOS.items()}
+
+    df = pd.read_excel(fonte, sheet_name=sheet_name)
+
+    df.columns = [col.lower().replace(' ', '_') for col in df.columns]
+    df.rename(columns=col_map_lower, inplace=True)
+
+    # Criação da chave para busca por escola
+    school_name_key = normalize_text(sheet_name).replace(' ', '_').strip()
+    school_name_display = sheet_name.replace('_', ' ').title()
+
+    df['Escola'] = school_name_display
+    df['Escola_Key'] = school_name_key  # Chave usada na busca
+
+    if 'direcao' in df.columns:
+        df['Direcao'] = df['direcao'].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
+        df['Direcao'] = df['Direcao'].fillna('')
+    else:
+        df['Direcao'] = ''
+
+    return df
+
+
+# Textos que o pandas.read_excel lê como célula vazia (na_values padrão); a leitura em streaming faz o mesmo
+VALORES_AUSENTES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+
+class LeitorPlanilha:
+    """
+    Abre uma planilha para leitura linha a linha: com python-calamine, se instalado, ou com o openpyxl em modo
+    somente leitura (só .xlsx). As linhas de cada aba são entregues como tuplas de valores, sem montar um DataFrame.
+    """
+
+    def __init__(self, caminho):
+        if CalamineWorkbook is not None:
+            self.workbook = CalamineWorkbook.from_path(caminho)
+        else:
+            from openpyxl import load_workbook
+            self.workbook = load_workbook(caminho, read_only=True, data_only=True)
+
+    @staticmethod
+    def suporta(caminho):
+        return CalamineWorkbook is not None or caminho.lower().endswith(('.xlsx', '.xlsm'))
+
+    def linhas(self, sheet_name):
+        if CalamineWorkbook is not None:
+            return self.workbook.get_sheet_by_name(sheet_name).iter_rows()
+        return self.workbook[sheet_name].iter_rows(values_only=True)
+
+    def close(self):
+        if hasattr(self.workbook, 'close'):
+            self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _valor_celula(valor):
+    """Converte o valor de uma célula como o pandas.read_excel: vazios viram None e números inteiros, int."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        return None if valor in VALORES_AUSENTES else valor
+    if isinstance(valor, float):
+        if valor != valor:
+            return None
+        if valor.is_integer():
+            return int(valor)
+    if isinstance(valor, date) and not isinstance(valor, datetime):
+        # O python-calamine entrega datas sem hora; o openpyxl (e o pandas), datetime
+        return datetime.combine(valor, datetime.min.time())
+    return valor
+
+
+def _ler_aba_presenca_streaming(leitor, sheet_name):
+    """
+    Versão em streaming de ler_aba_presenca: percorre as linhas uma a uma e guarda só as células preenchidas
+    (nomes) e o índice da data de cada uma; a memória usada fica limitada às presenças da aba.
+    """
+    linhas = iter(leitor.linhas(sheet_name))
+    datas_linha = [_valor_celula(valor) for valor in next(linhas, ())]
+
+    office_name_title = sheet_name.replace('_', ' ').title()
+
+    # Mesmo rótulo da leitura pelo pandas, que entrega as datas do cabeçalho como datetime
+    date_cols = [(i, str(valor).strip()) for i, valor in enumerate(datas_linha)
+                 if valor is not None and str(valor).strip() != '']
+
+    # Mesmas condições da leitura pelo pandas: ao menos 2 colunas e uma linha de nomes preenchida
+    largura = max((i + 1 for i, valor in enumerate(datas_linha) if valor is not None), default=0)
+    tem_nomes = False
+
+    nomes, indices_datas = [], []
+    for linha in linhas:
+        for posicao, (i, _) in enumerate(date_cols):
+            if i >= len(linha):
+                break
+            valor = _valor_celula(linha[i])
+            if valor is not None and str(valor).strip() != '':
+                nomes.append(valor)
+                indices_datas.append(posicao)
+
+        preenchidas = [i for i, valor in enumerate(linha) if _valor_celula(valor) is not None]
+        if preenchidas:
+            tem_nomes = True
+            largura = max(largura, preenchidas[-1] + 1)
+
+    if largura < 2 or not tem_nomes:
+        return None
+
+    rotulos = np.array([d for _, d in date_cols], dtype=object)
+    return (office_name_title, len(date_cols), np.array(nomes, dtype=object),
+            rotulos[np.array(indices_datas, dtype=np.int32)])
+
+
+def ler_aba_presenca(fonte, sheet_name):
+    """
+    Lê a aba de uma oficina na lista de presença.
+    Devolve (oficina, dias_totais, nomes, datas) com um item por célula preenchida,
+    ou None se a aba não tiver o formato esperado.
+    `fonte` pode ser um LeitorPlanilha (leitura em streaming), um pd.ExcelFile ou o caminho da planilha.
+    """
+    if isinstance(fonte, LeitorPlanilha):
+        return _ler_aba_presenca_streaming(fonte, sheet_name)
+    if isinstance(fonte, str) and LEITURA_STREAMING_PRESENCA and LeitorPlanilha.suporta(fonte):
+        with LeitorPlanilha(fonte) as leitor:
+            return _ler_aba_presenca_streaming(leitor, sheet_name)
+
+    df_raw = pd.read_excel(fonte, sheet_name=sheet_name, header=None)
+
+    if df_raw.empty or len(df_raw.columns) < 2 or len(df_raw) < 2:
+        return None
+
+    office_name_title = sheet_name.replace('_', ' ').title()
+
+    dates = df_raw.iloc[0, :].tolist()
+
+    date_cols = [
+        (i, col.strftime('%Y-%m-%d') if isinstance(col, pd.Timestamp) else str(col).strip())
+        for i, col in enumerate(dates) if pd.notna(col) and str(col).strip() != ''
+    ]
+
+    if not date_cols:
+        return office_name_title, 0, np.array([], dtype=object), np.array([], dtype=object)
+
+    # "Derrete" as colunas de datas em formato longo (linha a linha, como na planilha)
+    col_indices = [i for i, _ in date_cols]
+    valores = df_raw.iloc[1:, col_indices].to_numpy(dtype=object).ravel()
+    datas = np.tile(np.array([d for _, d in date_cols], dtype=object), len(df_raw) - 1)
+
+    serie = pd.Series(valores, dtype=object)
+    preenchidos = (serie.notna() & serie.astype(str).str.strip().ne('')).to_numpy()
+
+    return office_name_title, len(date_cols), valores[preenchidos], datas[preenchidos]
+
+
+# Partes do .xlsx compartilhadas por todas as abas: os textos das células ficam em sharedStrings
+# e os formatos (que decidem se um número é lido como data) em styles
+PARTES_COMPARTILHADAS_XLSX = ('sharedStrings', 'styles')
+
+
+def assinaturas_abas(caminho):
+    """
+    Assinatura de cada aba de um .xlsx, na ordem do arquivo: CRC32 e tamanho do XML da aba dentro do zip,
+    mais o CRC32 e o tamanho das partes compartilhadas (PARTES_COMPARTILHADAS_XLSX). Corrigir um nome no Excel
+    pode mudar só o sharedStrings.xml, então uma mudança nessas partes invalida todas as abas.
+    Só lê o diretório do zip, então é muito mais rápido que abrir a planilha.
+    Devolve None se o arquivo não for um .xlsx legível.
+    """
+    ns_main = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+    ns_rel = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+    ns_pkg = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+    def caminho_parte(alvo):
+        return alvo.lstrip('/') if alvo.startswith('/') else f'xl/{alvo}'
+
+    def assinatura_parte(caminho_xml):
+        info = arquivo.getinfo(caminho_xml)
+        return f'{info.CRC:08x}-{info.file_size}'
+
+    try:
+        with zipfile.ZipFile(caminho) as arquivo:
+            rels = list(ElementTree.fromstring(arquivo.read('xl/_rels/workbook.xml.rels')).iter(
+                f'{ns_pkg}Relationship'))
+            alvos = {rel.get('Id'): rel.get('Target') for rel in rels}
+
+            compartilhadas = ''.join(
+                f"/{assinatura_parte(caminho_parte(rel.get('Target')))}"
+                for parte in PARTES_COMPARTILHADAS_XLSX for rel in rels
+                if rel.get('Type', '').rsplit('/', 1)[-1] == parte)
+
+            workbook = ElementTree.fromstring(arquivo.read('xl/workbook.xml'))
+            assinaturas = {}
+            for aba in workbook.iter(f'{ns_main}sheet'):
+                caminho_xml = caminho_parte(alvos[aba.get(f'{ns_rel}id')])
+                assinaturas[aba.get('name')] = assinatura_parte(caminho_xml) + compartilhadas
+            return assinaturas
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return None
+
+
+def _separar_colunas_mistas(df):
+    """
+    O Parquet não guarda colunas com textos e números misturados (Matricula com 12345 e 'A-77', CPF gravado
+    como número em algumas linhas). Cada coluna mista vira três: os textos em <coluna>, os inteiros em
+    <coluna>#int e os demais números em <coluna>#float, para que _juntar_colunas_mistas devolva os mesmos valores
+    (normalizar_cpf, por exemplo, trata um CPF numérico de outro modo que o mesmo CPF em texto).
+    Devolve (DataFrame, nomes das colunas mistas).
+    """
+    mistas = []
+    for coluna in df.columns[df.dtypes == object]:
+        valores = df[coluna]
+        tipos = {type(valor) for valor in valores[valores.notna()]}
+        if tipos <= {str}:
+            continue
+
+        if not mistas:
+            df = df.copy()
+        mistas.append(coluna)
+        inteiros = valores.map(lambda v: isinstance(v, (int, np.integer)) and not isinstance(v, (bool, np.bool_)))
+        decimais = valores.map(lambda v: isinstance(v, (float, np.floating))) & valores.notna()
+        df[coluna] = valores.astype(str).where(valores.notna() & ~(inteiros | decimais), None)
+        df[f'{coluna}#int'] = pd.array(valores.where(inteiros, None).tolist(), dtype='Int64')
+        df[f'{coluna}#float'] = valores.where(decimais).astype(float)
+    return df, mistas
+
+
+def _juntar_colunas_mistas(df, mistas):
+    """Inverso de _separar_colunas_mistas."""
+    for coluna in mistas:
+        valores = df[coluna].astype(object).where(df[coluna].notna(), np.nan)
+        inteiros, decimais = df.pop(f'{coluna}#int'), df.pop(f'{coluna}#float')
+        valores[inteiros.notna()] = [int(valor) for valor in inteiros[inteiros.notna()]]
+        valores[decimais.notna()] = decimais[decimais.notna()].tolist()
+        df[coluna] = valores
+    return df
+
+
+def aba_para_cache(parte, resultado):
+    """Converte o resultado de ler_aba_* em (DataFrame, extras JSON) para o CacheDados."""
+    if parte != 'presenca':
+        df, mistas = _separar_colunas_mistas(resultado)
+        return df, {'mistas': mistas} if mistas else {}
+    if resultado is None:
+        return pd.DataFrame({'Nome': [], 'Data': []}, dtype=object), {'oficina': None}
+
+    office_name_title, dias_totais, nomes, datas = resultado
+    # Os nomes vão como texto: normalize_text(str(x)) == normalize_text(x) para qualquer valor preenchido
+    df = pd.DataFrame({'Nome': [str(nome) for nome in nomes], 'Data': [str(data) for data in datas]})
+    return df, {'oficina': office_name_title, 'dias_totais': dias_totais}
+
+
+def aba_do_cache(parte, df, extras):
+    """Inverso de aba_para_cache."""
+    if parte != 'presenca':
+        return _juntar_colunas_mistas(df, extras.get('mistas', []))
+    if extras['oficina'] is None:
+        return None
+
+    return (extras['oficina'], extras['dias_totais'],
+            df['Nome'].to_numpy(dtype=object), df['Data'].to_numpy(dtype=object))
+
+
+# CACHE EM DISCO DAS PLANILHAS PROCESSADAS
+
+class CacheDados:
+    """
+    Guarda em Parquet o resultado do processamento de cada aba das planilhas.
+    Cada aba é invalidada pela sua assinatura (ver assinaturas_abas), de modo que
+    alterar uma aba só reprocessa essa aba; mudar os textos compartilhados ou os estilos reprocessa todas.
+    Um cache gravado com outra VERSAO (outro formato de assinatura ou de conteúdo) é descartado inteiro.
+    Sem o pyarrow instalado, o cache fica desativado e as planilhas são lidas normalmente.
+    """
+
+    VERSAO = 2
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.meta_path = os.path.join(pasta, 'cache_meta.json')
+        self.meta = None
+        # Abas que não puderam ser gravadas: o aviso sai uma vez só, não a cada recarga
+        self.falhas = set()
+
+    def _entradas(self, parte):
+        if self.meta is None:
+            try:
+                with open(self.meta_path, encoding='utf-8') as f:
+                    self.meta = json.load(f)
+            except (OSError, ValueError):
+                self.meta = {}
+            # Entradas de outra versão podem ter sido gravadas com assinaturas que não cobrem o sharedStrings
+            if self.meta.get('versao') != self.VERSAO:
+                self.meta = {'versao': self.VERSAO}
+        return self.meta.setdefault(parte, {})
+
+    def _arquivo(self, parte, aba):
+        nome = hashlib.sha1(aba.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.pasta, f'{parte}_{nome}.parquet')
+
+    def carregar(self, parte, aba, assinatura):
+        """Devolve (DataFrame, extras) se a aba não mudou desde que foi guardada; caso contrário, None."""
+        entrada = self._entradas(parte).get(aba)
+        if not entrada or entrada['assinatura'] != assinatura:
+            return None
+
+        try:
+            df = pd.read_parquet(self._arquivo(parte, aba))
+        except Exception as e:
+            print(f"Cache da aba '{aba}' ignorado: {e}")
+            return None
+
+        return df, entrada.get('extras', {})
+
+    def salvar(self, parte, aba, assinatura, df, extras):
+        """Grava a aba processada junto da sua assinatura (a lista de abas só vai para o disco em gravar())."""
+        try:
+            os.makedirs(self.pasta, exist_ok=True)
+            df.to_parquet(self._arquivo(parte, aba))
+            self._entradas(parte)[aba] = {'assinatura': assinatura, 'extras': extras}
+        except Exception as e:
+            if (parte, aba) not in self.falhas:
+                self.falhas.add((parte, aba))
+                print(f"Não foi possível gravar o cache da aba '{aba}' (ela continua sendo lida do Excel): {e}")
+
+    def gravar(self, parte, abas_atuais):
+        """Descarta as abas que não existem mais na planilha e grava a lista de abas em disco."""
+        entradas = self._entradas(parte)
+        for aba in [aba for aba in entradas if aba not in abas_atuais]:
+            del entradas[aba]
+            try:
+                os.remove(self._arquivo(parte, aba))
+            except OSError:
+                pass
+
+        try:
+            os.makedirs(self.pasta, exist_ok=True)
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump(self.meta, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"Não foi possível gravar o índice do cache: {e}")
+
+
+# ÍNDICE DE BUSCA CADASTRAL
+
+class IndiceBusca:
+    """
+    Índice de busca por substring sobre colunas já normalizadas.
+    Os valores distintos de cada coluna entram num índice invertido de trigramas,
+    então uma consulta só confere os valores candidatos em vez de varrer a coluna inteira.
+    """
+
+    TAMANHO_NGRAMA = 3
+
+    def __init__(self, colunas_normalizadas):
+        self.total_linhas = 0
+        self.campos = {}
+
+        for campo, serie in colunas_normalizadas.items():
+            codigos, valores = pd.factorize(serie.to_numpy(dtype=object))
+            self.total_linhas = len(codigos)
+
+            # Linhas de cada valor distinto, em ordem crescente
+            ordem = np.argsort(codigos, kind='stable')
+            limites = np.cumsum(np.bincount(codigos, minlength=len(valores)))[:-1]
+            linhas_por_valor = np.split(ordem, limites)
+
+            ngramas = {}
+            for valor_id, valor in enumerate(valores):
+                for ngrama in self._ngramas(valor):
+                    ngramas.setdefault(ngrama, []).append(valor_id)
+
+            self.campos[campo] = (list(valores), linhas_por_valor, ngramas, codigos)
+
+    @classmethod
+    def _ngramas(cls, texto):
+        n = cls.TAMANHO_NGRAMA
+        return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+    def buscar(self, campo, termo, linhas=None):
+        """
+        Devolve as posições (ordenadas) das linhas cujo valor normalizado contém `termo`.
+        Com `linhas` (posições ordenadas, p.ex. o resultado de uma busca por um trecho de `termo`),
+        só essas linhas são conferidas.
+        """
+        if campo not in self.campos:
+            return np.array([], dtype=np.intp)
+        if termo == '':
+            return np.arange(self.total_linhas) if linhas is None else linhas
+
+        valores, linhas_por_valor, ngramas, codigos = self.campos[campo]
+
+        if linhas is not None:
+            codigos_linhas = codigos[linhas]
+            unicos = np.unique(codigos_linhas)
+            contem = np.zeros(len(valores), dtype=bool)
+            contem[unicos] = [termo in valores[valor_id] for valor_id in unicos]
+            return linhas[contem[codigos_linhas]]
+
+        if len(termo) < self.TAMANHO_NGRAMA:
+            candidatos = range(len(valores))
+        else:
+            listas = [ngramas.get(ngrama) for ngrama in self._ngramas(termo)]
+            if any(lista is None for lista in listas):
+                return np.array([], dtype=np.intp)
+            listas.sort(key=len)
+            candidatos = set(listas[0]).intersection(*listas[1:])
+
+        encontrados = [linhas_por_valor[valor_id] for valor_id in candidatos if termo in valores[valor_id]]
+        if not encontrados:
+            return np.array([], dtype=np.intp)
+
+        return np.sort(np.concatenate(encontrados))
+
+
+# ARMAZENAMENTO EM SQLITE
+
+def _minusculas(texto):
+    """lower() do Python para o SQLite, cujo lower() embutido só converte letras ASCII."""
+    return texto.lower() if isinstance(texto, str) else texto
+
+
+class BancoSQLite:
+    """
+    Armazenamento opcional (ARMAZENAMENTO = 'sqlite') dos dados já unificados num arquivo SQLite com índices.
+    É gravado a cada mudança das planilhas e pode ser aberto por várias instâncias (interface e linha de comando)
+    sem reler o Excel. As buscas e o cálculo de frequência viram consultas SQL parametrizadas; as consultas de
+    busca devolvem posições nos quadros pequenos mantidos em memória (cadastro, alunos com matrícula, oficinas),
+    enquanto os eventos de presença e a tabela de frequência ficam só no banco.
+    """
+
+    VERSAO = 2
+    SEPARADOR_DIAS = '\x1f'  # Separa os dias presentes, guardados num único texto por (Matricula, Oficina)
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    @contextmanager
+    def _conexao(self, caminho=None):
+        """Conexão somente leitura ao banco publicado ou, com `caminho`, de escrita nesse arquivo."""
+        if caminho is None:
+            conexao = sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.caminho))}?mode=ro", uri=True)
+        else:
+            conexao = sqlite3.connect(caminho)
+        conexao.create_function('minusculas', 1, _minusculas, deterministic=True)
+        try:
+            yield conexao
+        finally:
+            conexao.close()
+
+    def atualizado(self, assinatura):
+        """Indica se o banco foi gravado a partir das planilhas (e configurações) descritas em `assinatura`."""
+        if not os.path.exists(self.caminho):
+            return False
+        try:
+            with self._conexao() as conexao:
+                linha = conexao.execute("SELECT valor FROM metadados WHERE chave = 'assinatura'").fetchone()
+        except sqlite3.Error:
+            return False
+        return linha is not None and linha[0] == json.dumps(assinatura, sort_keys=True)
+
+    @staticmethod
+    def _gravar_tabela(conexao, nome, df, indices=()):
+        """Grava `df` (com a posição de cada linha em 'linha') e cria os índices pedidos."""
+        df = df.reset_index(drop=True)
+        df = df.astype({coluna: object for coluna in df.columns if isinstance(df[coluna].dtype, pd.CategoricalDtype)})
+        df.insert(0, 'linha', np.arange(len(df)))
+        df.to_sql(nome, conexao, index=False, chunksize=50000)
+        for i, colunas in enumerate(indices):
+            lista = ', '.join(f'"{coluna}"' for coluna in colunas)
+            conexao.execute(f'CREATE INDEX "idx_{nome}_{i}" ON "{nome}" ({lista})')
+
+    def publicar(self, data_loader, assinatura):
+        """
+        Grava os dados carregados em `data_loader` num arquivo temporário e o põe no lugar do banco atual,
+        então quem estiver lendo o banco nunca vê uma gravação pela metade.
+        """
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        if os.path.dirname(self.caminho):
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+        df_alunos = data_loader.df_alunos
+        tipos = {}
+
+        try:
+            with self._conexao(temporario) as conexao:
+                # Arquivo temporário: se a gravação falhar ele é descartado, então o diário do SQLite é dispensável
+                conexao.execute("PRAGMA journal_mode = OFF")
+                conexao.execute("PRAGMA synchronous = OFF")
+
+                # Cadastro (com o rótulo original de cada linha) e seus campos de busca já normalizados
+                alunos = df_alunos.copy()
+                alunos.insert(0, 'indice', df_alunos.index.to_numpy())
+                self._gravar_tabela(conexao, 'alunos', alunos)
+                tipos['alunos'] = {coluna: str(tipo) for coluna, tipo in df_alunos.dtypes.items()}
+
+                colunas_busca = data_loader._colunas_busca()
+                busca = pd.DataFrame({campo: serie.to_numpy(dtype=object) for campo, serie in colunas_busca.items()})
+                self._gravar_tabela(conexao, 'alunos_busca', busca)
+                chaves = pd.concat([pd.DataFrame({'campo': campo, 'chave': colunas_busca[campo].to_numpy(dtype=object),
+                                                  'posicao': np.arange(len(df_alunos))})
+                                    for campo in CAMPOS_CHAVE_EXATA if campo in colunas_busca]
+                                   or [pd.DataFrame(columns=['campo', 'chave', 'posicao'])], ignore_index=True)
+                self._gravar_tabela(conexao, 'alunos_chaves', chaves[chaves['chave'] != ''], [('campo', 'chave')])
+
+                # Alunos com matrícula e oficinas (quadros pequenos, devolvidos inteiros ao abrir o banco)
+                alunos_com_matricula = data_loader.alunos_com_matricula.copy()
+                alunos_com_matricula['Matricula_Normalizada'] = normalize_many(alunos_com_matricula['Matricula'])
+                self._gravar_tabela(conexao, 'alunos_com_matricula', alunos_com_matricula,
+                                    [('Matricula_Normalizada',)])
+                tipos['alunos_com_matricula'] = {
+                    coluna: str(tipo) for coluna, tipo in data_loader.alunos_com_matricula.dtypes.items()}
+                self._gravar_tabela(conexao, 'oficinas', data_loader.df_oficinas, [('Oficina',)])
+                tipos['oficinas'] = {coluna: str(tipo) for coluna, tipo in data_loader.df_oficinas.dtypes.items()}
+                self._gravar_tabela(conexao, 'conciliacao', data_loader.df_conciliacao_nomes)
+
+                # Eventos de presença e frequência por (Matricula, Oficina): ficam só no banco
+                presencas = data_loader.df_presenca_completa[['Matricula', 'Oficina', 'Data_Oficina', 'Data', 'Aluno']]
+                presencas = presencas.assign(Data=presencas['Data'].dt.strftime('%Y-%m-%d'))
+                self._gravar_tabela(conexao, 'presencas', presencas, [('Matricula',)])
+
+                # Um registro por dia de oficina, com os presentes já reunidos (posição do evento e nome), para
+                # que listar os presentes por data e o comparecimento não precisem percorrer todos os eventos
+                dias = data_loader.comparecimento_por_data()
+                alunos_presentes = data_loader.df_presenca_completa['Aluno'].to_numpy(dtype=object)
+                posicoes = [data_loader.presentes_por_dia[chave]
+                            for chave in zip(dias['Oficina'].astype(str), dias['Data_Oficina'].astype(str))]
+                dias = dias.astype({'Oficina': str, 'Data_Oficina': str})
+                dias['Data'] = dias['Data'].dt.strftime('%Y-%m-%d')
+                dias['Posicoes'] = [np.asarray(p, dtype=np.int64).tobytes() for p in posicoes]
+                dias['Alunos'] = [self.SEPARADOR_DIAS.join(map(str, alunos_presentes[p])) for p in posicoes]
+                self._gravar_tabela(conexao, 'presencas_por_dia', dias, [('Oficina', 'Data_Oficina')])
+
+                frequencia = data_loader.df_frequencia.reset_index()
+                frequencia['Dias_Presentes'] = frequencia['Dias_Presentes'].map(self.SEPARADOR_DIAS.join)
+                self._gravar_tabela(conexao, 'frequencia', frequencia, [('Matricula', 'Oficina')])
+
+                conexao.execute("CREATE TABLE metadados (chave TEXT PRIMARY KEY, valor TEXT)")
+                conexao.executemany("INSERT INTO metadados VALUES (?, ?)", [
+                    ('assinatura', json.dumps(assinatura, sort_keys=True)),
+                    ('tipos', json.dumps(tipos)),
+                ])
+                conexao.commit()
+            os.replace(temporario, self.caminho)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def abrir(self):
+        """Devolve os quadros pequenos guardados no banco: alunos, alunos_com_matricula, oficinas e conciliacao."""
+        with self._conexao() as conexao:
+            tipos = json.loads(conexao.execute("SELECT valor FROM metadados WHERE chave = 'tipos'").fetchone()[0])
+
+            def ler(nome):
+                df = pd.read_sql_query(f'SELECT * FROM "{nome}" ORDER BY linha', conexao).drop(columns=['linha'])
+                return df.astype(tipos[nome]) if nome in tipos else df
+
+            df_alunos = ler('alunos').set_index('indice')
+            df_alunos.index.name = None
+            alunos_com_matricula = ler('alunos_com_matricula')
+            return {
+                'alunos': df_alunos,
+                'alunos_com_matricula': alunos_com_matricula.drop(columns=['Matricula_Normalizada']),
+                'oficinas': ler('oficinas'),
+                'conciliacao': ler('conciliacao'),
+            }
+
+    def _posicoes(self, sql, parametros):
+        with self._conexao() as conexao:
+            return np.fromiter((linha for linha, in conexao.execute(sql, parametros)), dtype=np.intp)
+
+    def buscar_alunos(self, campo, termo):
+        """Posições no cadastro (ordenadas) cuja chave exata, ou então cujo campo normalizado, contém `termo`."""
+        if campo in CAMPOS_CHAVE_EXATA and termo != '':
+            posicoes = self._posicoes(
+                "SELECT posicao FROM alunos_chaves WHERE campo = ? AND chave = ? ORDER BY posicao", (campo, termo))
+            if len(posicoes):
+                return posicoes
+
+        with self._conexao() as conexao:
+            colunas = [linha[1] for linha in conexao.execute("PRAGMA table_info(alunos_busca)")]
+        if campo not in colunas or campo == 'linha':
+            return np.array([], dtype=np.intp)
+        return self._posicoes(f'SELECT linha FROM alunos_busca WHERE instr("{campo}", ?) > 0 ORDER BY linha', (termo,))
+
+    def buscar_matricula_exata(self, matricula_normalizada):
+        """Posições em alunos_com_matricula com essa matrícula (normalizada), ou None se não houver."""
+        posicoes = self._posicoes(
+            "SELECT linha FROM alunos_com_matricula WHERE Matricula_Normalizada = ? ORDER BY linha",
+            (matricula_normalizada,))
+        return posicoes if len(posicoes) else None
+
+    def filtrar_alunos(self, campo, termo):
+        """Posições em alunos_com_matricula cujo nome (normalizado) ou matrícula contém `termo`."""
+        if campo == "Aluno":
+            sql = "SELECT linha FROM alunos_com_matricula WHERE instr(Aluno_Normalized, ?) > 0 ORDER BY linha"
+        else:
+            sql = "SELECT linha FROM alunos_com_matricula WHERE instr(minusculas(Matricula), ?) > 0 ORDER BY linha"
+        return self._posicoes(sql, (termo,))
+
+    def filtrar_oficinas(self, termo):
+        """Posições em oficinas cujo nome contém `termo` (sem diferenciar maiúsculas)."""
+        return self._posicoes(
+            "SELECT linha FROM oficinas WHERE instr(minusculas(Oficina), minusculas(?)) > 0 ORDER BY linha", (termo,))
+
+    def frequencia(self, df_alunos, df_oficinas):
+        """
+        Frequência de cada aluno de `df_alunos` em cada oficina de `df_oficinas` (mesmas colunas e ordem de
+        DataLoader.calcular_frequencia). A seleção vai para o SQLite como JSON e o produto é feito no banco.
+        """
+        selecao = df_alunos[['Matricula', 'Aluno', 'Escola']].astype(object)
+        alunos = json.dumps(selecao.where(selecao.notna(), None).to_numpy().tolist())
+        oficinas = json.dumps(df_oficinas['Oficina'].astype(str).tolist())
+        sql = """
+            WITH sel_alunos AS (
+                SELECT CAST(key AS INTEGER) AS ordem, json_extract(value, '$[0]') AS Matricula,
+                       json_extract(value, '$[1]') AS Aluno, json_extract(value, '$[2]') AS Escola
+                FROM json_each(?)),
+            sel_oficinas AS (
+                SELECT CAST(j.key AS INTEGER) AS ordem, o.Oficina, o.Dias_Totais_Oficina
+                FROM json_each(?) AS j JOIN oficinas AS o ON o.Oficina = j.value)
+            SELECT a.Matricula, a.Aluno, a.Escola, o.Oficina, o.Dias_Totais_Oficina,
+                   coalesce(f.Presencas_Contadas, 0) AS Presencas_Contadas,
+                   CASE WHEN o.Dias_Totais_Oficina > 0 THEN coalesce(f.Frequencia_Percentual, 0.0) END
+                       AS Frequencia_Percentual,
+                   coalesce(f.Dias_Presentes, '') AS Dias_Presentes
+            FROM sel_alunos AS a CROSS JOIN sel_oficinas AS o
+            LEFT JOIN frequencia AS f ON f.Matricula = a.Matricula AND f.Oficina = o.Oficina
+            ORDER BY a.Matricula, o.Oficina, a.ordem, o.ordem
+        """
+        with self._conexao() as conexao:
+            df_group = pd.read_sql_query(sql, conexao, params=(alunos, oficinas))
+
+        df_group['Frequencia_Percentual'] = df_group['Frequencia_Percentual'].astype(float)
+        df_group['Dias_Presentes'] = [
+            tuple(dias.split(self.SEPARADOR_DIAS)) if dias else () for dias in df_group['Dias_Presentes']
+        ]
+        return df_group
+
+    def presentes_por_data(self, oficinas):
+        """
+        Nomes dos alunos presentes em cada data das oficinas informadas (ver DataLoader.presentes_por_data),
+        na ordem dos eventos de presença.
+        """
+        sql = """
+            SELECT Data_Oficina, Posicoes, Alunos FROM presencas_por_dia
+            WHERE Oficina IN (SELECT value FROM json_each(?))
+            ORDER BY Data_Oficina, linha
+        """
+        por_data = {}
+        with self._conexao() as conexao:
+            for data, posicoes, alunos in conexao.execute(sql, (json.dumps([str(oficina) for oficina in oficinas]),)):
+                partes = por_data.setdefault(data, ([], []))
+                partes[0].append(np.frombuffer(posicoes, dtype=np.int64))
+                partes[1].extend(alunos.split(self.SEPARADOR_DIAS))
+
+        presentes = {}
+        for data, (posicoes, alunos) in por_data.items():
+            alunos = np.array(alunos, dtype=object)
+            presentes[data] = alunos if len(posicoes) == 1 else alunos[
+                np.argsort(np.concatenate(posicoes), kind='stable')]
+        return presentes
+
+    def participacoes(self):
+        """Linhas da tabela de frequência (uma por aluno e oficina com presença)."""
+        sql = """
+            SELECT Matricula, Oficina, Presencas_Contadas, Dias_Totais_Oficina, Frequencia_Percentual
+            FROM frequencia ORDER BY linha
+        """
+        with self._conexao() as conexao:
+            return pd.read_sql_query(sql, conexao)
+
+    def comparecimento_por_data(self):
+        """Alunos presentes (distintos) em cada data de cada oficina."""
+        sql = """
+            SELECT Oficina, Data_Oficina, Data, Presentes FROM presencas_por_dia ORDER BY linha
+        """
+        with self._conexao() as conexao:
+            df = pd.read_sql_query(sql, conexao)
+        df['Data'] = pd.to_datetime(df['Data'])
+        return df
+
+    def total_presencas(self):
+        with self._conexao() as conexao:
+            return conexao.execute("SELECT count(*) FROM presencas").fetchone()[0]
+
+
+# MEDIÇÃO DE DESEMPENHO
+
+class RelatorioDesempenho:
+    """
+    Registra, para cada etapa medida, o tempo de parede, a quantidade de linhas produzidas e
+    (com MEDIR_MEMORIA_ETAPAS) a variação de memória alocada pelo Python, medida com tracemalloc.
+    Etapas podem ser aninhadas; `nivel` indica a profundidade. Com ARQUIVO_LOG_DESEMPENHO,
+    cada etapa concluída também é gravada como uma linha JSON nesse arquivo.
+    """
+
+    def __init__(self, operacao, limite=None):
+        self.operacao = operacao
+        self.etapas = deque(maxlen=limite)
+        self._nivel = 0
+
+    def limpar(self):
+        self.etapas.clear()
+
+    @contextmanager
+    def medir(self, etapa, linhas=None):
+        """
+        Mede o bloco `with`. O registro devolvido pode receber o número de linhas depois de calculado:
+            with relatorio.medir('leitura') as registro:
+                df = ...
+                registro['linhas'] = len(df)
+        """
+        registro = {'etapa': etapa, 'nivel': self._nivel, 'tempo_s': None, 'linhas': linhas, 'memoria_mb': None}
+        self.etapas.append(registro)
+
+        iniciou_tracemalloc = MEDIR_MEMORIA_ETAPAS and not tracemalloc.is_tracing()
+        if iniciou_tracemalloc:
+            tracemalloc.start()
+        memoria_inicial = tracemalloc.get_traced_memory()[0] if MEDIR_MEMORIA_ETAPAS else None
+
+        self._nivel += 1
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['tempo_s'] = time.perf_counter() - inicio
+            self._nivel -= 1
+            if memoria_inicial is not None:
+                registro['memoria_mb'] = (tracemalloc.get_traced_memory()[0] - memoria_inicial) / 1024 ** 2
+            if iniciou_tracemalloc:
+                tracemalloc.stop()
+            if ARQUIVO_LOG_DESEMPENHO:
+                self._gravar_log(registro)
+
+    def _gravar_log(self, registro):
+        linha = dict(registro, operacao=self.operacao, data_hora=datetime.now().isoformat(timespec='seconds'))
+        try:
+            with open(ARQUIVO_LOG_DESEMPENHO, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(linha, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"Não foi possível gravar o log de desempenho: {e}")
+
+    def como_tabela(self):
+        """As etapas registradas como DataFrame (uma linha por etapa, na ordem em que começaram)."""
+        return pd.DataFrame(list(self.etapas), columns=['etapa', 'nivel', 'tempo_s', 'linhas', 'memoria_mb'])
+
+    def resumo(self):
+        """Texto com uma linha por etapa, indentada conforme o aninhamento."""
+        linhas = []
+        for registro in self.etapas:
+            texto = f"{'  ' * registro['nivel']}{registro['etapa']}"
+            detalhes = f"{registro['tempo_s']:8.3f} s" if registro['tempo_s'] is not None else "     ... "
+            if registro['linhas'] is not None:
+                detalhes += f"  {registro['linhas']:>9} linhas"
+            if registro['memoria_mb'] is not None:
+                detalhes += f"  {registro['memoria_mb']:+8.1f} MB"
+            linhas.append(f"{texto:<40s}{detalhes}")
+        return '\n'.join(linhas)
+
+
+# CLASSE DE CARREGAMENTO E PROCESSAMENTO DE DADOS
+
+class DataLoader:
+    """
+    Carrega, limpa e unifica os dados das planilhas.
+    busca por Escola (Escola_Key) e cálculo de frequência.
+    """
+
+    def __init__(self, planilha_trilhas=None, planilha_presenca=None, pasta_cache=None, arquivo_banco=None,
+                 periodo=None):
+        # Planilhas e armazenamento deste carregador (por padrão, os de Const.py; ver CatalogoPeriodos)
+        self.planilha_trilhas = planilha_trilhas or PLANILHA_TRILHAS
+        self.planilha_presenca = planilha_presenca or PLANILHA_PRESENCA
+        self.periodo = periodo
+        # Tamanho e data das planilhas no início da última carga (ver atualizado)
+        self.assinatura_carregada = None
+
+        self.df_alunos = pd.DataFrame()
+        self.df_presenca_completa = pd.DataFrame()
+        self.is_loaded = False
+        # Falso até a planilha de presença ser lida (load_data com incluir_presenca=False a adia)
+        self.presenca_carregada = False
+        self.error_message = ""
+        self.total_dias_por_oficina = {}
+        # Modelo esparso de presença: apenas os dias efetivamente presentes
+        self.alunos_com_matricula = pd.DataFrame()
+        self.df_oficinas = pd.DataFrame()
+        # Frequência pré-calculada por (Matricula, Oficina) e alunos presentes por (Oficina, Data_Oficina)
+        self.df_frequencia = pd.DataFrame()
+        self.presentes_por_dia = {}
+        self.indice_alunos = None
+        # Nomes da presença sem correspondência exata no cadastro (ver conciliar_nomes)
+        self.df_conciliacao_nomes = pd.DataFrame()
+        # Índices exatos (CAMPOS_CHAVE_EXATA) do cadastro e das matrículas de alunos_com_matricula
+        self.indices_exatos = {}
+        self.indice_matriculas = {}
+        # Resultado de cada aba já lida: parte -> {aba: (assinatura, resultado)}, na ordem da planilha.
+        # Permite recarregar relendo só as abas alteradas.
+        self.abas = {'trilhas': {}, 'presenca': {}}
+        self.abas_relidas = {'trilhas': [], 'presenca': []}
+        self.cache = CacheDados(pasta_cache or PASTA_CACHE) if USAR_CACHE and PYARROW_DISPONIVEL else None
+        # Com ARMAZENAMENTO = 'sqlite', as consultas passam a usar o banco assim que ele estiver gravado ou aberto
+        self.banco = BancoSQLite(arquivo_banco or ARQUIVO_BANCO) if ARMAZENAMENTO == 'sqlite' else None
+        self.usando_banco = False
+        # Callback opcional progresso(evento, texto, percentual), usado pelo carregamento em segundo plano
+        self.progresso = None
+        # Tempo, linhas e memória de cada etapa da última carga e das buscas mais recentes
+        self.desempenho_carga = RelatorioDesempenho('carga')
+        self.desempenho_buscas = RelatorioDesempenho('busca', limite=LIMITE_REGISTROS_BUSCAS)
+
+    def _notificar(self, evento, texto, percentual):
+        """Repassa o andamento do carregamento para quem o acompanha (se houver)."""
+        if self.progresso is not None:
+            self.progresso(evento, texto, percentual)
+
+    def _load_trilhas_formativas(self):
+        """Carrega e unifica os dados cadastrais, criando a chave normalizada de escola (Escola_Key)."""
+        if not os.path.exists(self.planilha_trilhas):
+            raise FileNotFoundError(f"Arquivo não encontrado: {self.planilha_trilhas}")
+
+        medir = self.desempenho_carga.medir
+
+        with medir("cadastro: leitura das abas") as registro:
+            df_list = self._ler_abas('trilhas', self.planilha_trilhas, ler_aba_alunos, "Lendo cadastro", 0)
+            registro['linhas'] = sum(len(df) for df in df_list)
+
+        with medir("cadastro: unificação e duplicatas") as registro:
+            df_alunos = pd.concat(df_list, ignore_index=True, sort=False)
+
+            df_alunos['Matricula'] = df_alunos['Matricula'].astype(str).str.strip().str.upper()
+            df_alunos.drop_duplicates(subset=['Matricula'], keep='first', inplace=True)
+            registro['linhas'] = len(df_alunos)
+
+        with medir("cadastro: normalização dos nomes", linhas=len(df_alunos)):
+            df_alunos['Aluno_Normalized'] = normalize_series(df_alunos['Aluno'])
+
+        with medir("cadastro: compactação das colunas", linhas=len(df_alunos)):
+            df_alunos = compactar_colunas(df_alunos, COLUNAS_CATEGORICAS_ALUNOS)
+
+        return df_alunos
+
+    def _ler_planilha_presenca(self):
+        """
+        Lê as listas de presença e devolve um registro por nome/oficina/data (sem duplicatas).
+        Também preenche total_dias_por_oficina.
+        """
+        nomes_parts, oficinas_parts, datas_parts = [], [], []
+        if not os.path.exists(self.planilha_presenca):
+            raise FileNotFoundError(f"Arquivo não encontrado: {self.planilha_presenca}")
+
+        self.total_dias_por_oficina = {}
+        medir = self.desempenho_carga.medir
+
+        with medir("presença: leitura das abas") as registro:
+            streaming = LEITURA_STREAMING_PRESENCA and LeitorPlanilha.suporta(self.planilha_presenca)
+            resultados = self._ler_abas('presenca', self.planilha_presenca, ler_aba_presenca, "Lendo presença", 50,
+                                        abrir=LeitorPlanilha if streaming else pd.ExcelFile)
+            registro['linhas'] = sum(len(resultado[2]) for resultado in resultados if resultado is not None)
+
+        for resultado in resultados:
+            if resultado is None:
+                continue
+
+            office_name_title, dias_totais, nomes, datas = resultado
+            self.total_dias_por_oficina[office_name_title] = dias_totais
+
+            nomes_parts.append(nomes)
+            datas_parts.append(datas)
+            oficinas_parts.append(np.full(len(nomes), office_name_title, dtype=object))
+
+        if nomes_parts:
+            nomes = np.concatenate(nomes_parts)
+            with medir("presença: normalização dos nomes", linhas=len(nomes)):
+                df_presenca_nomes = pd.DataFrame({
+                    'Aluno_Normalized': normalize_many(nomes),
+                    'Oficina': np.concatenate(oficinas_parts),
+                    'Data_Oficina': np.concatenate(datas_parts),
+                    'Presenca': 1
+                })
+        else:
+            return pd.DataFrame()
+
+        # Remove duplicatas para garantir que cada aluno conte 1x por dia/oficina.
+        with medir("presença: remoção de duplicatas") as registro:
+            df_presenca_nomes.drop_duplicates(subset=['Aluno_Normalized', 'Oficina', 'Data_Oficina'], inplace=True)
+            registro['linhas'] = len(df_presenca_nomes)
+
+        return df_presenca_nomes
+
+    def _load_presenca_trilhas(self, df_alunos):
+        """
+        Carrega os dados de presença e unifica.
+        """
+        df_presenca_nomes = self._ler_planilha_presenca()
+
+        if df_presenca_nomes.empty:
+            self.df_presenca_completa = pd.DataFrame()
+            self.alunos_com_matricula = pd.DataFrame()
+            self.indice_matriculas = {}
+            self.df_conciliacao_nomes = pd.DataFrame()
+            self.df_oficinas = pd.DataFrame()
+            self.df_frequencia = pd.DataFrame()
+            self.presentes_por_dia = {}
+            return self.df_presenca_completa
+
+        medir = self.desempenho_carga.medir
+
+        with medir("presença: alunos com matrícula") as registro:
+            alunos_com_matricula = df_alunos[
+                ['Matricula', 'Escola', 'Escola_Key', 'Aluno', 'Aluno_Normalized']].copy().drop_duplicates(
+                subset=['Aluno_Normalized', 'Matricula'])
+            alunos_com_matricula = alunos_com_matricula[alunos_com_matricula['Aluno_Normalized'] != '']
+            alunos_com_matricula = alunos_com_matricula.drop(columns=['Escola_Key']).reset_index(drop=True)
+            registro['linhas'] = len(alunos_com_matricula)
+
+        self.alunos_com_matricula = alunos_com_matricula
+        self.indice_matriculas = indice_exato(normalize_many(alunos_com_matricula['Matricula']))
+        self.df_oficinas = pd.DataFrame(self.total_dias_por_oficina.items(),
+                                        columns=['Oficina', 'Dias_Totais_Oficina'])
+
+        if CORRESPONDENCIA_APROXIMADA_NOMES:
+            with medir("presença: nomes aproximados") as registro:
+                df_presenca_nomes = self._conciliar_nomes_presenca(df_presenca_nomes)
+                registro['linhas'] = len(self.df_conciliacao_nomes)
+
+        # Somente as presenças reais (sem o produto cartesiano aluno x oficina).
+        # A ordem segue aluno -> oficina -> planilha, como na antiga tabela completa.
+        df_presenca_nomes['_ordem_presenca'] = np.arange(len(df_presenca_nomes))
+        alunos_ordem = alunos_com_matricula.assign(_ordem_aluno=np.arange(len(alunos_com_matricula)))
+        oficinas_ordem = self.df_oficinas.assign(_ordem_oficina=np.arange(len(self.df_oficinas)))
+
+        with medir("presença: junção com alunos") as registro:
+            df_eventos = pd.merge(alunos_ordem, df_presenca_nomes, on='Aluno_Normalized', how='inner')
+            registro['linhas'] = len(df_eventos)
+        with medir("presença: junção com oficinas") as registro:
+            df_eventos = pd.merge(df_eventos, oficinas_ordem, on='Oficina', how='inner')
+            registro['linhas'] = len(df_eventos)
+        with medir("presença: ordenação", linhas=len(df_eventos)):
+            df_eventos = df_eventos.sort_values(['_ordem_aluno', '_ordem_oficina', '_ordem_presenca'], kind='stable')
+
+            df_presenca = df_eventos[
+                ['Matricula', 'Oficina', 'Dias_Totais_Oficina', 'Escola', 'Aluno', 'Aluno_Normalized',
+                 'Data_Oficina', 'Presenca']].reset_index(drop=True)
+
+        # Textos repetidos a cada presença viram códigos inteiros; Data guarda a data real de Data_Oficina
+        with medir("presença: compactação das colunas", linhas=len(df_presenca)):
+            df_presenca = compactar_colunas(df_presenca, COLUNAS_CATEGORICAS_PRESENCA)
+            df_presenca['Presenca'] = df_presenca['Presenca'].astype(np.int8)
+            df_presenca['Dias_Totais_Oficina'] = df_presenca['Dias_Totais_Oficina'].astype(np.int16)
+            df_presenca.insert(df_presenca.columns.get_loc('Data_Oficina') + 1, 'Data',
+                               datas_reais(df_presenca['Data_Oficina']))
+            self.df_presenca_completa = df_presenca
+
+        with medir("presença: tabela de frequência") as registro:
+            self._construir_tabela_frequencia()
+            registro['linhas'] = len(self.df_frequencia)
+
+        return self.df_presenca_completa
+
+    def _conciliar_nomes_presenca(self, df_presenca_nomes):
+        """
+        Troca os nomes da presença com erro de digitação pelo nome cadastrado correspondente (ver conciliar_nomes)
+        e guarda a tabela de conciliação em df_conciliacao_nomes, com as oficinas em que cada nome aparece.
+        """
+        associacoes, conciliacao = conciliar_nomes(df_presenca_nomes['Aluno_Normalized'].unique(),
+                                                   self.alunos_com_matricula['Aluno_Normalized'].unique())
+
+        oficinas_por_nome = df_presenca_nomes.groupby('Aluno_Normalized')['Oficina'].agg(
+            lambda oficinas: ', '.join(pd.unique(oficinas)))
+        conciliacao.insert(1, 'Oficinas', conciliacao['Nome_Presenca'].map(oficinas_por_nome))
+        self.df_conciliacao_nomes = conciliacao
+
+        if not associacoes:
+            return df_presenca_nomes
+
+        df_presenca_nomes['Aluno_Normalized'] = df_presenca_nomes['Aluno_Normalized'].replace(associacoes)
+        # O mesmo aluno pode ter sido digitado certo e errado na mesma data: conta 1x
+        return df_presenca_nomes.drop_duplicates(subset=['Aluno_Normalized', 'Oficina', 'Data_Oficina'])
+
+    def _construir_tabela_frequencia(self):
+        """
+        Pré-calcula, uma única vez por carga, a frequência de cada (Matricula, Oficina) com presença registrada
+        e a lista de alunos presentes em cada dia de cada oficina. As buscas passam a ser só consultas a essas tabelas.
+        """
+        df_eventos = self.df_presenca_completa.sort_values(['Matricula', 'Oficina', 'Data_Oficina'], kind='stable')
+
+        df_frequencia = df_eventos.groupby(['Matricula', 'Oficina'], observed=True).agg(
+            Presencas_Contadas=('Data_Oficina', 'size'),
+            Dias_Totais_Oficina=('Dias_Totais_Oficina', 'first'),
+            Dias_Presentes=('Data_Oficina', tuple)
+        )
+        df_frequencia['Frequencia_Percentual'] = (
+                df_frequencia['Presencas_Contadas'] / df_frequencia['Dias_Totais_Oficina'] * 100).round(1)
+        self.df_frequencia = df_frequencia
+
+        # Posições (em df_presenca_completa) dos alunos presentes em cada (Oficina, Data_Oficina)
+        self.presentes_por_dia = self.df_presenca_completa.groupby(['Oficina', 'Data_Oficina'], observed=True).indices
+
+    def _ler_abas(self, parte, caminho, ler_aba, descricao, percentual_inicial, abrir=pd.ExcelFile):
+        """
+        Aplica `ler_aba` a cada aba da planilha e devolve os resultados na ordem das abas.
+        Abas cuja assinatura não mudou são reaproveitadas da memória (ou do cache em disco);
+        só as alteradas são lidas do Excel. Com CARREGAMENTO_PARALELO, essas abas são distribuídas entre processos.
+        """
+        assinaturas = assinaturas_abas(caminho)
+        if assinaturas is None:
+            with pd.ExcelFile(caminho) as xls:
+                assinaturas = dict.fromkeys(xls.sheet_names)
+
+        anteriores = self.abas[parte]
+        lidas = {}
+        pendentes = []
+
+        for aba, assinatura in assinaturas.items():
+            if assinatura is not None and aba in anteriores and anteriores[aba][0] == assinatura:
+                lidas[aba] = anteriores[aba][1]
+                continue
+
+            cached = self.cache.carregar(parte, aba, assinatura) if self.cache and assinatura else None
+            if cached is not None:
+                lidas[aba] = aba_do_cache(parte, *cached)
+            else:
+                pendentes.append(aba)
+
+        def notificar(i, sheet_name):
+            self._notificar('planilha', f"{descricao}: {sheet_name}",
+                            percentual_inicial + 50 * i / len(pendentes))
+
+        if CARREGAMENTO_PARALELO and len(pendentes) > 1:
+            with ProcessPoolExecutor(max_workers=PROCESSOS_CARREGAMENTO) as executor:
+                # map() devolve na ordem das abas, independentemente de qual processo termina antes
+                for i, (sheet_name, resultado) in enumerate(
+                        zip(pendentes, executor.map(ler_aba, repeat(caminho), pendentes)), start=1):
+                    notificar(i, sheet_name)
+                    lidas[sheet_name] = resultado
+        elif pendentes:
+            with abrir(caminho) as xls:
+                for i, sheet_name in enumerate(pendentes, start=1):
+                    notificar(i, sheet_name)
+                    lidas[sheet_name] = ler_aba(xls, sheet_name)
+
+        if self.cache is not None:
+            for aba in pendentes:
+                if assinaturas[aba] is not None:
+                    self.cache.salvar(parte, aba, assinaturas[aba], *aba_para_cache(parte, lidas[aba]))
+            self.cache.gravar(parte, assinaturas)
+
+        self.abas[parte] = {aba: (assinatura, lidas[aba]) for aba, assinatura in assinaturas.items()}
+        self.abas_relidas[parte] = pendentes
+
+        return [lidas[aba] for aba in assinaturas]
+
+    def _colunas_busca(self):
+        """Campos de busca cadastral já normalizados (o texto que as buscas comparam), por campo."""
+        colunas = {}
+        for campo in CAMPOS_BUSCA_DADOS:
+            if campo == "Aluno":
+                colunas[campo] = self.df_alunos['Aluno_Normalized']
+            elif campo == "Escola":
+                colunas[campo] = self.df_alunos['Escola_Key']
+            elif campo == "CPF" and campo in self.df_alunos.columns:
+                colunas[campo] = self.df_alunos[campo].map(normalizar_cpf).astype(object)
+            elif campo in self.df_alunos.columns:
+                colunas[campo] = normalize_series(self.df_alunos[campo].astype(str))
+        return colunas
+
+    def _construir_indice_alunos(self):
+        """
+        Normaliza uma única vez cada campo de busca cadastral e monta o índice de trigramas
+        e os índices exatos de CAMPOS_CHAVE_EXATA.
+        """
+        colunas = self._colunas_busca()
+        self.indice_alunos = IndiceBusca(colunas)
+        self.indices_exatos = {campo: indice_exato(colunas[campo]) for campo in CAMPOS_CHAVE_EXATA if campo in colunas}
+
+    def _busca_exata(self, search_by, search_value):
+        """Posições em df_alunos com o valor exato pesquisado (campos de CAMPOS_CHAVE_EXATA), ou None."""
+        indice = self.indices_exatos.get(search_by)
+        if indice is None:
+            return None
+        return indice.get(chave_busca(search_by, search_value))
+
+    # CONSULTAS (usadas pela interface e pela linha de comando)
+
+    @staticmethod
+    def _reaproveita(anterior, search_by, search_value):
+        """
+        Indica se o resultado de uma busca anterior, `anterior` = (search_by, search_value, resultado), pode
+        servir de ponto de partida: mesmo campo e novo termo contendo o anterior (como ao continuar digitando),
+        caso em que os novos resultados são um subconjunto dos anteriores.
+        """
+        return (anterior is not None and anterior[0] == search_by
+                and chave_busca(search_by, anterior[1]) in chave_busca(search_by, search_value))
+
+    def buscar_alunos(self, search_by, search_value, anterior=None):
+        """
+        Busca cadastral: alunos cujo campo `search_by` contém o texto pesquisado (sem acentos/maiúsculas).
+        Colunas já normalizadas no carregamento; a busca só confere as linhas candidatas do índice.
+        `anterior` = (search_by, search_value, resultado) de uma busca anterior; ver _reaproveita.
+        """
+        with self.desempenho_buscas.medir(f"busca cadastral ({search_by})") as registro:
+            if self.usando_banco:
+                df_filtered = self.df_alunos.iloc[self.banco.buscar_alunos(search_by, chave_busca(search_by, search_value))]
+                registro['linhas'] = len(df_filtered)
+                return df_filtered
+
+            # Matrícula ou CPF completos: consulta direta ao índice exato
+            posicoes = self._busca_exata(search_by, search_value)
+
+            if posicoes is None:
+                linhas = None
+                # Um resultado exato anterior não contém todos os alunos com o trecho pesquisado
+                if (self._reaproveita(anterior, search_by, search_value)
+                        and self._busca_exata(search_by, anterior[1]) is None):
+                    linhas = self.df_alunos.index.get_indexer(anterior[2].index)
+                    if (linhas < 0).any():  # Resultado de uma carga anterior dos dados
+                        linhas = None
+
+                posicoes = self.indice_alunos.buscar(search_by, chave_busca(search_by, search_value), linhas)
+
+            df_filtered = self.df_alunos.iloc[posicoes]
+            registro['linhas'] = len(df_filtered)
+
+        return df_filtered
+
+    def filtrar_frequencia(self, search_by, search_value, anterior=None):
+        """
+        Devolve (alunos, oficinas) selecionados por uma busca de frequência por Aluno, Matricula ou Oficina.
+        `anterior` = (search_by, search_value, (alunos, oficinas)) de uma busca anterior; ver _reaproveita.
+        """
+        df_alunos = self.alunos_com_matricula
+        df_oficinas = self.df_oficinas
+
+        normalized_search = normalize_text(search_value)
+
+        if self.usando_banco:
+            return self._filtrar_frequencia_banco(search_by, search_value, normalized_search)
+
+        # Matrícula completa: consulta direta ao índice exato
+        exata = self.indice_matriculas.get(normalized_search) if search_by == "Matricula" else None
+
+        # A busca por Oficina usa o texto original (e a lista de oficinas é pequena), então não reaproveita
+        if search_by != "Oficina" and self._reaproveita(anterior, search_by, search_value):
+            if search_by != "Matricula" or normalize_text(anterior[1]) not in self.indice_matriculas:
+                df_alunos = anterior[2][0]
+
+        with self.desempenho_buscas.medir(f"filtro de frequência ({search_by})") as registro:
+            if exata is not None:
+                df_alunos = self.alunos_com_matricula.iloc[exata]
+            elif search_by == "Aluno":
+                df_alunos = df_alunos[
+                    df_alunos['Aluno_Normalized'].str.contains(normalized_search, na=False, regex=False)]
+            elif search_by == "Matricula":
+                df_alunos = df_alunos[df_alunos['Matricula'].astype(str).str.contains(
+                    normalized_search, na=False, case=False, regex=False)]
+            elif search_by == "Oficina":
+                df_oficinas = df_oficinas[
+                    df_oficinas['Oficina'].str.contains(search_value, na=False, case=False, regex=False)]
+            registro['linhas'] = len(df_alunos) * len(df_oficinas)
+
+        return df_alunos, df_oficinas
+
+    def _filtrar_frequencia_banco(self, search_by, search_value, normalized_search):
+        """filtrar_frequencia com ARMAZENAMENTO = 'sqlite': cada filtro é uma consulta ao banco."""
+        df_alunos = self.alunos_com_matricula
+        df_oficinas = self.df_oficinas
+
+        with self.desempenho_buscas.medir(f"filtro de frequência ({search_by}, sqlite)") as registro:
+            if search_by == "Oficina":
+                df_oficinas = df_oficinas.iloc[self.banco.filtrar_oficinas(search_value)]
+            elif search_by in ("Aluno", "Matricula"):
+                exata = self.banco.buscar_matricula_exata(normalized_search) if search_by == "Matricula" else None
+                if exata is None:
+                    exata = self.banco.filtrar_alunos(search_by, normalized_search)
+                df_alunos = df_alunos.iloc[exata]
+            registro['linhas'] = len(df_alunos) * len(df_oficinas)
+
+        return df_alunos, df_oficinas
+
+    def calcular_frequencia(self, df_alunos=None, df_oficinas=None):
+        """
+        Frequência de cada aluno em cada oficina (por padrão, todos x todas), ordenada por Matricula e Oficina.
+        Combinações sem presença registrada aparecem com 0 dias.
+        """
+        df_alunos = self.alunos_com_matricula if df_alunos is None else df_alunos
+        df_oficinas = self.df_oficinas if df_oficinas is None else df_oficinas
+
+        medir = self.desempenho_buscas.medir
+
+        if self.usando_banco:
+            with medir("frequência: consulta sqlite", linhas=len(df_alunos) * len(df_oficinas)):
+                df_group = self.banco.frequencia(df_alunos, df_oficinas)
+                df_group['Dias_Totais_Oficina'] = df_group['Dias_Totais_Oficina'].astype(
+                    df_oficinas['Dias_Totais_Oficina'].dtype)
+            return df_group
+
+        # Uma linha por Matricula e Oficina, incluindo as oficinas sem presença registrada
+        with medir("frequência: produto aluno x oficina", linhas=len(df_alunos) * len(df_oficinas)):
+            df_group = pd.merge(
+                df_alunos[['Matricula', 'Aluno', 'Escola']],
+                df_oficinas[['Oficina', 'Dias_Totais_Oficina']],
+                how='cross'
+            ).sort_values(['Matricula', 'Oficina'], kind='stable').reset_index(drop=True)
+
+        # Consulta direta à tabela pré-calculada; combinações ausentes são alunos sem presença (0 dias)
+        with medir("frequência: consulta à tabela", linhas=len(df_group)):
+            frequencia = self.df_frequencia.reindex(pd.MultiIndex.from_frame(df_group[['Matricula', 'Oficina']]))
+
+        df_group['Presencas_Contadas'] = frequencia['Presencas_Contadas'].fillna(0).astype(int).to_numpy()
+        df_group['Frequencia_Percentual'] = frequencia['Frequencia_Percentual'].fillna(0.0).to_numpy()
+        df_group['Frequencia_Percentual'] = df_group['Frequencia_Percentual'].where(
+            df_group['Dias_Totais_Oficina'] > 0)
+        df_group['Dias_Presentes'] = [
+            dias if isinstance(dias, tuple) else () for dias in frequencia['Dias_Presentes']
+        ]
+
+        return df_group
+
+    def presentes_por_data(self, oficinas):
+        """Nomes dos alunos presentes em cada data das oficinas informadas, em ordem de data."""
+        with self.desempenho_buscas.medir("presentes por data") as registro:
+            if self.usando_banco:
+                presentes = self.banco.presentes_por_data(oficinas)
+                registro['linhas'] = len(presentes)
+                return presentes
+
+            oficinas = set(oficinas)
+            posicoes_por_data = {}
+            for (oficina, data), posicoes in self.presentes_por_dia.items():
+                if oficina in oficinas:
+                    posicoes_por_data.setdefault(data, []).append(posicoes)
+
+            alunos = self.df_presenca_completa['Aluno'].to_numpy()
+            registro['linhas'] = len(posicoes_por_data)
+
+            return {
+                data: alunos[np.sort(np.concatenate(posicoes_por_data[data]))]
+                for data in sorted(posicoes_por_data)
+            }
+
+    def participacoes(self):
+        """Frequência de cada (Matricula, Oficina) com presença registrada, uma linha por par."""
+        if self.usando_banco:
+            return self.banco.participacoes()
+        return self.df_frequencia[
+            ['Presencas_Contadas', 'Dias_Totais_Oficina', 'Frequencia_Percentual']].reset_index()
+
+    def comparecimento_por_data(self):
+        """Alunos presentes (distintos) em cada data de cada oficina: Oficina, Data_Oficina, Data, Presentes."""
+        if self.usando_banco:
+            return self.banco.comparecimento_por_data()
+        return self.df_presenca_completa.groupby(['Oficina', 'Data_Oficina'], observed=True).agg(
+            Data=('Data', 'first'),
+            Presentes=('Matricula', 'nunique'),
+        ).reset_index()
+
+    def total_presencas(self):
+        """Quantidade de registros de presença carregados."""
+        return self.banco.total_presencas() if self.usando_banco else len(self.df_presenca_completa)
+
+    def relatorio_memoria(self):
+        """Linhas, colunas e memória (MB) de cada quadro carregado."""
+        quadros = {
+            'df_alunos': self.df_alunos,
+            'df_presenca_completa': self.df_presenca_completa,
+            'alunos_com_matricula': self.alunos_com_matricula,
+            'df_oficinas': self.df_oficinas,
+            'df_frequencia': self.df_frequencia,
+            'df_conciliacao_nomes': self.df_conciliacao_nomes,
+        }
+        return pd.DataFrame(
+            [(nome, len(df), len(df.columns), memoria_mb(df)) for nome, df in quadros.items()],
+            columns=['Quadro', 'Linhas', 'Colunas', 'Memoria_MB'])
+
+    def has_presenca(self):
+        """Indica se há alunos e oficinas suficientes para calcular frequências."""
+        return not self.alunos_com_matricula.empty and not self.df_oficinas.empty
+
+    def load_data(self, progresso=None, perfil=None, incluir_presenca=True):
+        """
+        Ponto de entrada para carregar todos os dados.
+        Também serve para recarregar: só as abas alteradas desde a última carga são relidas do Excel
+        (ver abas_relidas); os quadros unificados são remontados a partir das abas em memória.
+        `progresso(evento, texto, percentual)` é chamado a cada planilha lida e quando os dados cadastrais ficam prontos.
+        O tempo de cada etapa fica em desempenho_carga. Com `perfil` (caminho de arquivo), esta carga é executada
+        sob o cProfile e as estatísticas são gravadas nesse arquivo (abrir com pstats ou snakeviz).
+        Com `incluir_presenca=False` só o cadastro é carregado; as listas de presença ficam para carregar_presenca().
+        """
+        self.desempenho_carga.limpar()
+
+        if perfil:
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(self._carregar, progresso, incluir_presenca)
+            finally:
+                profiler.dump_stats(perfil)
+        else:
+            self._carregar(progresso, incluir_presenca)
+
+    def carregar_presenca(self, progresso=None):
+        """
+        Carrega as listas de presença sobre o cadastro já em memória (ver load_data com incluir_presenca=False).
+        Usado pela interface para só ler a planilha de presença quando a tela de frequência é aberta.
+        """
+        self.progresso = progresso
+        self.error_message = ""
+
+        if not os.path.exists(self.planilha_presenca):
+            self.error_message = ERRO_ARQUIVO_NAO_ENCONTRADO
+            return
+
+        try:
+            self._unificar_presenca()
+        except Exception as e:
+            self.error_message = f"{ERRO_DADOS}\nDetalhe do erro: {e}"
+            print(f"Erro fatal no carregamento de dados: {e}")
+
+    def _carregar(self, progresso, incluir_presenca=True):
+        self.progresso = progresso
+        self.error_message = ""
+        self.assinatura_carregada = self.assinatura_planilhas()
+
+        if not os.path.exists(self.planilha_trilhas) or (
+                incluir_presenca and not os.path.exists(self.planilha_presenca)):
+            self.error_message = ERRO_ARQUIVO_NAO_ENCONTRADO
+            self.is_loaded = False
+            return
+
+        medir = self.desempenho_carga.medir
+
+        # Banco já gravado a partir destas planilhas: usa-o sem reler o Excel
+        if self.banco is not None and self.banco.atualizado(self._assinatura_banco()):
+            try:
+                with medir("abertura do banco sqlite"):
+                    self._abrir_banco()
+                self._notificar('alunos_prontos', "Dados carregados do banco SQLite.", 100)
+                self.is_loaded = not self.df_alunos.empty
+                return
+            except Exception as e:
+                print(f"Banco SQLite ignorado (as planilhas serão relidas): {e}")
+
+        self.usando_banco = False
+
+        try:
+            with medir("cadastro") as registro:
+                self.df_alunos = self._load_trilhas_formativas()
+                registro['linhas'] = len(self.df_alunos)
+            with medir("índice de busca cadastral", linhas=len(self.df_alunos)):
+                self._construir_indice_alunos()
+            self._notificar('alunos_prontos', "Dados cadastrais carregados.", 50)
+
+            if not incluir_presenca:
+                self.is_loaded = not self.df_alunos.empty
+                if not self.is_loaded:
+                    self.error_message = "Nenhum dado cadastral carregado."
+                return
+
+            self._unificar_presenca()
+            self.is_loaded = not self.df_alunos.empty or self.has_presenca()
+            if not self.is_loaded:
+                self.error_message = "Nenhum dado cadastral ou de presença carregado."
+
+        except Exception as e:
+            self.error_message = f"{ERRO_DADOS}\nDetalhe do erro: {e}"
+            self.is_loaded = False
+            print(f"Erro fatal no carregamento de dados: {e}")
+
+    def _unificar_presenca(self):
+        """Lê as listas de presença e as unifica com o cadastro já carregado."""
+        alunos_validos = self.df_alunos[self.df_alunos['Aluno_Normalized'] != ''].copy()
+        with self.desempenho_carga.medir("presença") as registro:
+            df_completo = self._load_presenca_trilhas(alunos_validos)
+            registro['linhas'] = len(df_completo)
+        self.presenca_carregada = True
+
+        if not self.has_presenca():
+            if not self.df_alunos.empty:
+                self.error_message = "Dados cadastrais carregados, mas a unificação de presença falhou (ou não há registros de presença)."
+            return
+
+        self.df_presenca_completa = df_completo
+
+        if self.banco is not None:
+            try:
+                with self.desempenho_carga.medir("gravação do banco sqlite", linhas=len(df_completo)):
+                    self.banco.publicar(self, self._assinatura_banco())
+                self._usar_banco()
+            except Exception as e:
+                print(f"Não foi possível gravar o banco SQLite ({self.banco.caminho}): {e}")
+
+    def assinatura_planilhas(self):
+        """Tamanho e data de modificação de cada planilha (None se não existir)."""
+        assinatura = []
+        for caminho in (self.planilha_trilhas, self.planilha_presenca):
+            try:
+                stat = os.stat(caminho)
+                assinatura.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                assinatura.append(None)
+        return assinatura
+
+    def atualizado(self):
+        """Indica se os dados carregados correspondem às planilhas atuais (nada a reler)."""
+        return self.is_loaded and self.assinatura_carregada == self.assinatura_planilhas()
+
+    def _assinatura_banco(self):
+        """Tamanho e data das planilhas e configurações que mudam o conteúdo do banco."""
+        return {'versao': BancoSQLite.VERSAO, 'planilhas': [list(item) if item else None for item in self.assinatura_planilhas()],
+                'configuracao': [CORRESPONDENCIA_APROXIMADA_NOMES, LIMIAR_SIMILARIDADE_NOMES, LIMIAR_REVISAO_NOMES,
+                                 MARGEM_AMBIGUIDADE_NOMES, CAMPOS_BUSCA_DADOS, CAMPOS_CHAVE_EXATA]}
+
+    def _abrir_banco(self):
+        """Carrega do banco os quadros pequenos; presenças e frequências continuam só no banco."""
+        tabelas = self.banco.abrir()
+        self.df_alunos = tabelas['alunos']
+        self.alunos_com_matricula = tabelas['alunos_com_matricula']
+        self.df_oficinas = tabelas['oficinas']
+        self.total_dias_por_oficina = dict(zip(self.df_oficinas['Oficina'], self.df_oficinas['Dias_Totais_Oficina']))
+        self.df_conciliacao_nomes = tabelas['conciliacao']
+        # As abas em memória não correspondem mais aos quadros; um recarregamento relê as planilhas
+        self.abas = {'trilhas': {}, 'presenca': {}}
+        self.abas_relidas = {'trilhas': [], 'presenca': []}
+        self.presenca_carregada = True
+        self._usar_banco()
+
+    def _usar_banco(self):
+        """Passa as consultas para o banco e libera os quadros grandes e os índices em memória."""
+        self.usando_banco = True
+        self.df_presenca_completa = pd.DataFrame()
+        self.df_frequencia = pd.DataFrame()
+        self.presentes_por_dia = {}
+        self.indice_alunos = None
+        self.indices_exatos = {}
+        self.indice_matriculas = {}
+
+
+# VÁRIOS PERÍODOS
+
+def descobrir_periodos(fonte):
+    """
+    Períodos encontrados em `fonte` (uma pasta ou um padrão glob), em ordem: {periodo: (planilha_trilhas,
+    planilha_presenca)}. Um período é uma pasta com as duas planilhas (com os nomes de PLANILHA_TRILHAS e
+    PLANILHA_PRESENCA) ou um par de planilhas com o período no fim do nome (trilhas_formativas_2025-1.xlsx e
+    lista_presenca_trilhas_formativas_2025-1.xlsx). Só entram os períodos com as duas planilhas.
+    """
+    if not fonte:
+        return {}
+    caminhos = glob.glob(os.path.join(fonte, '*')) if os.path.isdir(fonte) else glob.glob(fonte)
+    nomes = [os.path.basename(PLANILHA_TRILHAS), os.path.basename(PLANILHA_PRESENCA)]
+
+    encontrados = {}
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            periodo = os.path.basename(os.path.normpath(caminho))
+            encontrados[periodo] = [os.path.join(caminho, nome) for nome in nomes]
+            continue
+
+        arquivo = os.path.basename(caminho)
+        for i, nome in enumerate(nomes):
+            base, extensao = os.path.splitext(nome)
+            if arquivo.startswith(base + '_') and arquivo.endswith(extensao):
+                periodo = arquivo[len(base) + 1:len(arquivo) - len(extensao)]
+                encontrados.setdefault(periodo, [None, None])[i] = caminho
+
+    return {periodo: tuple(planilhas) for periodo, planilhas in sorted(encontrados.items())
+            if all(planilha and os.path.isfile(planilha) for planilha in planilhas)}
+
+
+class CatalogoPeriodos:
+    """
+    Períodos (semestres) disponíveis em FONTE_PERIODOS. Cada período é uma partição independente: tem o seu
+    DataLoader, o seu cache em disco (PASTA_CACHE/<periodo>) e, com ARMAZENAMENTO = 'sqlite', o seu banco.
+    Um período só é lido quando consultado pela primeira vez, então trabalhar no período atual não custa a leitura
+    dos anteriores. Sem períodos em FONTE_PERIODOS, há um único período (PERIODO_UNICO) com as planilhas de sempre.
+    """
+
+    def __init__(self, fonte=None):
+        self.planilhas = descobrir_periodos(FONTE_PERIODOS if fonte is None else fonte)
+        self.particionado = bool(self.planilhas)
+        if not self.particionado:
+            self.planilhas = {PERIODO_UNICO: (PLANILHA_TRILHAS, PLANILHA_PRESENCA)}
+        self.carregadores = {}
+
+    @property
+    def periodos(self):
+        return list(self.planilhas)
+
+    def atual(self):
+        """PERIODO_ATUAL, se existir; caso contrário, o último período em ordem alfabética."""
+        return PERIODO_ATUAL if PERIODO_ATUAL in self.planilhas else self.periodos[-1]
+
+    def carregador(self, periodo):
+        """DataLoader do período, criado (sem carregar) na primeira vez em que é pedido."""
+        if periodo not in self.planilhas:
+            raise KeyError(f"Período desconhecido: {periodo} (disponíveis: {', '.join(self.periodos)})")
+
+        if periodo not in self.carregadores:
+            if self.particionado:
+                trilhas, presenca = self.planilhas[periodo]
+                raiz, extensao = os.path.splitext(ARQUIVO_BANCO)
+                self.carregadores[periodo] = DataLoader(trilhas, presenca, os.path.join(PASTA_CACHE, periodo),
+                                                        f"{raiz}_{periodo}{extensao}", periodo)
+            else:
+                self.carregadores[periodo] = DataLoader(periodo=periodo)
+        return self.carregadores[periodo]
+
+    def carregar(self, periodo, progresso=None):
+        """DataLoader do período com cadastro e presença; só relê as planilhas se elas mudaram desde a última carga."""
+        data_loader = self.carregador(periodo)
+        if not data_loader.atualizado():
+            data_loader.load_data(progresso=progresso)
+        elif not data_loader.presenca_carregada:
+            data_loader.carregar_presenca(progresso=progresso)
+        return data_loader
+
+    def frequencia(self, search_by=None, search_value=None, periodos=None, progresso=None):
+        """
+        Frequência (como DataLoader.calcular_frequencia) em vários períodos, com a coluna Periodo à frente;
+        por padrão, em todos. Com `search_value`, filtra cada período como filtrar_frequencia.
+        """
+        partes = []
+        for periodo in periodos or self.periodos:
+            data_loader = self.carregar(periodo, progresso)
+            if not data_loader.has_presenca():
+                continue
+
+            if search_value:
+                df_alunos, df_oficinas = data_loader.filtrar_frequencia(search_by, search_value)
+            else:
+                df_alunos, df_oficinas = None, None
+
+            df_group = data_loader.calcular_frequencia(df_alunos, df_oficinas)
+            df_group.insert(0, 'Periodo', periodo)
+            partes.append(df_group)
+
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
@@ -0,0 +1,132 @@
+"""
+Exportação em lote da frequência de toda a rede: um arquivo por escola (XLSX ou CSV) com a frequência de cada
+aluno em cada oficina (e os dias presentes) e um resumo por aluno, sem precisar de uma busca por aluno.
+O resultado completo é calculado uma única vez; cada escola é gravada linha a linha (openpyxl em modo write_only)
+e, com EXPORTACAO_PARALELA, as escolas são distribuídas entre processos.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+
+from Const import EXPORTACAO_PARALELA, PROCESSOS_EXPORTACAO, LIMITE_FREQUENCIA_RISCO
+from data_loader import normalize_text
+
+COLUNAS_FREQUENCIA = ['Matricula', 'Aluno', 'Oficina', 'Dias_Totais_Oficina', 'Presencas_Contadas',
+                      'Frequencia_Percentual', 'Dias_Presentes']
+COLUNAS_RESUMO = ['Matricula', 'Aluno', 'Oficinas_Com_Presenca', 'Presencas', 'Dias_Possiveis', 'Frequencia_Geral',
+                  'Oficinas_Abaixo_Limite']
+
+
+def resumo_por_aluno(df_frequencia, limite=LIMITE_FREQUENCIA_RISCO):
+    """
+    Uma linha por aluno: oficinas com presença, presenças, dias possíveis nessas oficinas, frequência geral
+    (presenças / dias possíveis) e quantas dessas oficinas ficaram abaixo de `limite`.
+    """
+    participou = df_frequencia['Presencas_Contadas'] > 0
+    resumo = df_frequencia.assign(
+        Participou=participou,
+        Dias_Participados=df_frequencia['Dias_Totais_Oficina'].where(participou, 0),
+        Abaixo=participou & (df_frequencia['Frequencia_Percentual'] < limite),
+    ).groupby(['Escola', 'Matricula', 'Aluno'], sort=False).agg(
+        Oficinas_Com_Presenca=('Participou', 'sum'),
+        Presencas=('Presencas_Contadas', 'sum'),
+        Dias_Possiveis=('Dias_Participados', 'sum'),
+        Oficinas_Abaixo_Limite=('Abaixo', 'sum'),
+    ).reset_index()
+
+    dias = resumo['Dias_Possiveis'].where(resumo['Dias_Possiveis'] > 0)
+    resumo['Frequencia_Geral'] = (resumo['Presencas'] / dias * 100).round(1)
+    return resumo
+
+
+def nome_arquivo(escola, usados):
+    """Nome de arquivo seguro (sem acentos nem símbolos) para a escola, sem repetir os já usados."""
+    base = re.sub(r'[^a-z0-9]+', '_', normalize_text(escola)).strip('_') or 'sem_escola'
+    nome, i = base, 2
+    while nome in usados:
+        nome, i = f"{base}_{i}", i + 1
+    usados.add(nome)
+    return nome
+
+
+def _linhas(df):
+    """Linhas de `df` como tuplas de valores nativos (NaN vira célula vazia)."""
+    for linha in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        yield linha
+
+
+def exportar_escola(caminho_base, formato, df_frequencia, df_resumo):
+    """
+    Grava os arquivos de uma escola e devolve os caminhos gravados. Em XLSX, um arquivo com as abas
+    'Frequencia' e 'Resumo por aluno'; em CSV, <escola>_frequencia.csv e <escola>_resumo.csv.
+    """
+    if formato == 'csv':
+        gravados = []
+        for sufixo, df in (('frequencia', df_frequencia), ('resumo', df_resumo)):
+            caminho = f"{caminho_base}_{sufixo}.csv"
+            df.to_csv(caminho, index=False, encoding='utf-8-sig')
+            gravados.append(caminho)
+        return gravados
+
+    # write_only: as linhas vão direto para o arquivo, sem montar a planilha inteira em memória
+    wb = Workbook(write_only=True)
+    for titulo, df in (('Frequencia', df_frequencia), ('Resumo por aluno', df_resumo)):
+        ws = wb.create_sheet(titulo)
+        ws.append(list(df.columns))
+        for linha in _linhas(df):
+            ws.append(linha)
+
+    caminho = f"{caminho_base}.xlsx"
+    wb.save(caminho)
+    return [caminho]
+
+
+def exportar_por_escola(data_loader, pasta, formato='xlsx', limite=LIMITE_FREQUENCIA_RISCO, progresso=None):
+    """
+    Calcula a frequência de todos os alunos em todas as oficinas e grava os arquivos de cada escola em `pasta`.
+    `progresso(texto, percentual)` é chamado a cada escola gravada. Devolve a lista de arquivos gravados.
+    """
+    if formato not in ('xlsx', 'csv'):
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+    medir = data_loader.desempenho_buscas.medir
+
+    with medir("exportação: frequência completa") as registro:
+        df_frequencia = data_loader.calcular_frequencia()
+        df_frequencia['Dias_Presentes'] = df_frequencia['Dias_Presentes'].map(', '.join)
+        escolas = df_frequencia['Escola'].astype(object)
+        df_frequencia['Escola'] = escolas.where(escolas.notna(), '')
+        registro['linhas'] = len(df_frequencia)
+
+    with medir("exportação: resumo por aluno") as registro:
+        df_resumo = resumo_por_aluno(df_frequencia, limite)
+        registro['linhas'] = len(df_resumo)
+
+    os.makedirs(pasta, exist_ok=True)
+    usados = set()
+    tarefas = []
+    resumos = dict(list(df_resumo.groupby('Escola', sort=True)))
+    for escola, df_escola in df_frequencia.groupby('Escola', sort=True):
+        caminho_base = os.path.join(pasta, nome_arquivo(escola, usados))
+        tarefas.append((escola, caminho_base, df_escola[COLUNAS_FREQUENCIA], resumos[escola][COLUNAS_RESUMO]))
+
+    gravados = []
+    with medir("exportação: gravação dos arquivos", linhas=len(df_frequencia)):
+        def concluida(i, escola, arquivos):
+            gravados.extend(arquivos)
+            if progresso is not None:
+                progresso(f"Exportando: {escola}", 100 * i / len(tarefas))
+
+        if EXPORTACAO_PARALELA and len(tarefas) > 1:
+            with ProcessPoolExecutor(max_workers=PROCESSOS_EXPORTACAO) as executor:
+                futuros = [executor.submit(exportar_escola, caminho_base, formato, df_escola, df_resumo_escola)
+                           for _, caminho_base, df_escola, df_resumo_escola in tarefas]
+                for i, ((escola, *_), futuro) in enumerate(zip(tarefas, futuros), start=1):
+                    concluida(i, escola, futuro.result())
+        else:
+            for i, (escola, caminho_base, df_escola, df_resumo_escola) in enumerate(tarefas, start=1):
+                concluida(i, escola, exportar_escola(caminho_base, formato, df_escola, df_resumo_escola))
+
+    return gravados
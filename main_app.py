@@ -1,9 +1,14 @@
+import time
+
+# Referência para medir o tempo até a primeira janela (ver App._janela_exibida)
+INICIO_PROGRAMA = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
+from tkinter import ttk, messagebox, filedialog
 import os
-import unicodedata
-import numpy as np
+import math
+import queue
+import threading
 
 try:
     from Const import *
@@ -15,34 +20,12 @@ except Exception as e:
     messagebox.showerror("Erro de Importação", f"Erro desconhecido ao carregar Const.py: {e}")
     exit()
 
-try:
-    from PIL import Image, ImageTk
-except ImportError:
-    messagebox.showerror("Erro de Dependência",
-                         "A biblioteca 'Pillow (PIL)' não está instalada. Execute 'pip install Pillow' no seu terminal.")
-    exit()
+# O Pillow e a camada de dados (pandas/numpy) só são importados quando necessários:
+# ver carregar_imagem_fundo e App._carregar_dados
 
 
 # FUNÇÕES AUXILIARES
 
-def normalize_text(text):
-    """
-    Remove acentos, converte para minúsculas, remove espaços extras e trata NaN/None.
-    É crucial para a busca de alunos e escolas.
-    """
-    if pd.isna(text) or text is None:
-        return ""
-
-    try:
-        text_str = str(text).strip()
-    except Exception:
-        return ""
-
-    normalized = unicodedata.normalize('NFD', text_str).encode('ascii', 'ignore').decode("utf-8")
-    normalized = ' '.join(normalized.split())
-    return normalized.lower()
-
-
 def create_menu_button(parent, text, command):
     """Cria um botão padronizado para o menu."""
     return tk.Button(
@@ -58,173 +41,136 @@ def create_menu_button(parent, text, command):
     )
 
 
-# CLASSE DE CARREGAMENTO E PROCESSAMENTO DE DADOS
-
-class DataLoader:
+def carregar_imagem_fundo(caminho, largura, altura):
     """
-    Carrega, limpa e unifica os dados das planilhas.
-    busca por Escola (Escola_Key) e cálculo de frequência.
+    Devolve a imagem de fundo no tamanho da janela.
+    A versão redimensionada fica guardada em PASTA_CACHE e, nas próximas aberturas, é lida direto pelo Tk (PNG),
+    sem importar o Pillow; ela só é refeita quando a imagem original muda ou o tamanho da janela é outro.
     """
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    em_cache = os.path.join(PASTA_CACHE, f"{nome}_{largura}x{altura}.png")
+    if os.path.exists(em_cache) and os.path.getmtime(em_cache) >= os.path.getmtime(caminho):
+        return tk.PhotoImage(file=em_cache)
 
-    def __init__(self):
-        self.df_alunos = pd.DataFrame()
-        self.df_presenca_completa = pd.DataFrame()
-        self.is_loaded = False
-        self.error_message = ""
-        self.total_dias_por_oficina = {}
-
-    def _load_trilhas_formativas(self):
-        """Carrega e unifica os dados cadastrais, criando a chave normalizada de escola (Escola_Key)."""
-        df_list = []
-        if not os.path.exists(PLANILHA_TRILHAS):
-            raise FileNotFoundError(f"Arquivo não encontrado: {PLANILHA_TRILHAS}")
-
-        xls = pd.ExcelFile(PLANILHA_TRILHAS)
-        col_map_lower = {k.lower(): v for k, v in COLUNAS_ALUNOS.items()}
-
-        for sheet_name in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-
-            df.columns = [col.lower().replace(' ', '_') for col in df.columns]
-            df.rename(columns=col_map_lower, inplace=True)
-
-            # Criação da chave para busca por escola
-            school_name_key = normalize_text(sheet_name).replace(' ', '_').strip()
-            school_name_display = sheet_name.replace('_', ' ').title()
-
-            df['Escola'] = school_name_display
-            df['Escola_Key'] = school_name_key  # Chave usada na busca
-
-            if 'direcao' in df.columns:
-                df['Direcao'] = df['direcao'].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
-                df['Direcao'] = df['Direcao'].fillna('')
-            else:
-                df['Direcao'] = ''
-
-            df_list.append(df)
-
-        df_alunos = pd.concat(df_list, ignore_index=True, sort=False)
-
-        df_alunos['Matricula'] = df_alunos['Matricula'].astype(str).str.strip().str.upper()
-        df_alunos.drop_duplicates(subset=['Matricula'], keep='first', inplace=True)
-
-        df_alunos['Aluno_Normalized'] = df_alunos['Aluno'].apply(normalize_text)
+    from PIL import Image, ImageTk
+    img = Image.open(caminho).resize((largura, altura), Image.LANCZOS)
+    try:
+        os.makedirs(PASTA_CACHE, exist_ok=True)
+        img.save(em_cache)
+    except OSError as e:
+        print(f"Não foi possível guardar a imagem de fundo em cache: {e}")
+    return ImageTk.PhotoImage(img)
 
-        return df_alunos
 
-    def _load_presenca_trilhas(self, df_alunos):
-        """
-        Carrega os dados de presença e unifica.
-        """
-        all_presences_list = []
-        if not os.path.exists(PLANILHA_PRESENCA):
-            raise FileNotFoundError(f"Arquivo não encontrado: {PLANILHA_PRESENCA}")
-
-        xls = pd.ExcelFile(PLANILHA_PRESENCA)
+def executar_em_segundo_plano(widget, tarefa, ao_concluir):
+    """
+    Executa `tarefa()` numa thread separada e chama `ao_concluir(resultado, erro)` no loop do Tk quando terminar
+    (`erro` é a exceção levantada, ou None). A interface continua respondendo enquanto a tarefa roda.
+    """
+    fila = queue.Queue(maxsize=1)
 
-        for sheet_name in xls.sheet_names:
-            df_raw = pd.read_excel(xls, sheet_name=sheet_name, header=None)
+    def executar():
+        try:
+            fila.put((tarefa(), None))
+        except Exception as e:
+            fila.put((None, e))
 
-            if df_raw.empty or len(df_raw.columns) < 2 or len(df_raw) < 2:
-                continue
+    def verificar():
+        try:
+            resultado, erro = fila.get_nowait()
+        except queue.Empty:
+            widget.after(INTERVALO_VERIFICACAO_BUSCA_MS, verificar)
+            return
+        ao_concluir(resultado, erro)
 
-            office_name = normalize_text(sheet_name)
-            office_name_title = sheet_name.replace('_', ' ').title()
+    threading.Thread(target=executar, daemon=True).start()
+    widget.after(INTERVALO_VERIFICACAO_BUSCA_MS, verificar)
 
-            dates = df_raw.iloc[0, :].tolist()
 
-            date_cols = [
-                (i, col.strftime('%Y-%m-%d') if isinstance(col, pd.Timestamp) else str(col).strip())
-                for i, col in enumerate(dates) if pd.notna(col) and str(col).strip() != ''
-            ]
+class ResultadoPaginado:
+    """
+    Texto de um resultado de busca dividido em páginas de ITENS_POR_PAGINA itens.
+    `secoes` é uma lista de (titulo, total_itens, formatar), onde formatar(inicio, fim) devolve o texto
+    desses itens; o cabeçalho e os títulos das seções presentes se repetem em cada página.
+    Cada página só é formatada quando pedida (e guardada para as próximas vezes).
+    """
 
-            dias_totais = len(date_cols)
-            self.total_dias_por_oficina[office_name_title] = dias_totais
+    def __init__(self, cabecalho, secoes=()):
+        self.cabecalho = cabecalho
+        self.secoes = list(secoes)
+        total_itens = sum(total for _, total, _ in self.secoes)
+        self.total_paginas = max(1, math.ceil(total_itens / ITENS_POR_PAGINA))
+        self._paginas = {}
 
-            for row_index in range(1, len(df_raw)):
-                for col_index, date_str in date_cols:
-                    present_student_name_raw = df_raw.iloc[row_index, col_index]
+    def pagina(self, numero):
+        if numero not in self._paginas:
+            inicio_pagina = numero * ITENS_POR_PAGINA
+            fim_pagina = inicio_pagina + ITENS_POR_PAGINA
 
-                    if pd.notna(present_student_name_raw) and str(present_student_name_raw).strip() != '':
-                        normalized_present_name = normalize_text(present_student_name_raw)
+            partes = [self.cabecalho]
+            deslocamento = 0
+            for titulo, total, formatar in self.secoes:
+                inicio = max(inicio_pagina - deslocamento, 0)
+                fim = min(fim_pagina - deslocamento, total)
+                if inicio < fim:
+                    partes.append(titulo)
+                    partes.append(formatar(inicio, fim))
+                deslocamento += total
 
-                        all_presences_list.append({
-                            'Aluno_Normalized': normalized_present_name,
-                            'Oficina': office_name_title,
-                            'Data_Oficina': date_str,
-                            'Presenca': 1
-                        })
+            self._paginas[numero] = ''.join(partes)
 
-        df_presenca_nomes = pd.DataFrame(all_presences_list)
+        return self._paginas[numero]
 
-        if df_presenca_nomes.empty:
-            self.df_presenca_completa = pd.DataFrame()
-            return self.df_presenca_completa
 
-        # Remove duplicatas para garantir que cada aluno conte 1x por dia/oficina.
-        df_presenca_nomes.drop_duplicates(subset=['Aluno_Normalized', 'Oficina', 'Data_Oficina'], inplace=True)
+class ResultadosPaginados(tk.Frame):
+    """
+    Área de resultados (tk.Text) com navegação entre páginas.
+    Só a página atual é inserida no Text, então buscas com milhares de alunos aparecem imediatamente.
+    """
 
-        alunos_com_matricula = df_alunos[
-            ['Matricula', 'Escola', 'Escola_Key', 'Aluno', 'Aluno_Normalized']].copy().drop_duplicates(
-            subset=['Aluno_Normalized', 'Matricula'])
-        alunos_com_matricula = alunos_com_matricula[alunos_com_matricula['Aluno_Normalized'] != '']
+    def __init__(self, parent):
+        tk.Frame.__init__(self, parent, bg=COR_CINZA_CLARO)
+        self.resultado = ResultadoPaginado("")
+        self.pagina_atual = 0
 
-        df_oficinas_info = pd.DataFrame(self.total_dias_por_oficina.items(), columns=['Oficina', 'Dias_Totais_Oficina'])
+        self.results_text = tk.Text(self, wrap=tk.WORD, width=70, height=22, font=FONTE_PRINCIPAL, bg=COR_BRANCA)
+        self.results_text.pack()
 
-        from itertools import product
-        all_combinations = list(
-            product(alunos_com_matricula['Matricula'].unique(), df_oficinas_info['Oficina'].unique()))
+        navegacao = tk.Frame(self, bg=COR_CINZA_CLARO)
+        navegacao.pack(pady=(5, 0))
 
-        df_cartesian = pd.DataFrame(all_combinations, columns=['Matricula', 'Oficina'])
-        df_cartesian = pd.merge(df_cartesian, df_oficinas_info, on='Oficina', how='left')
+        self.btn_anterior = tk.Button(navegacao, text="< Anterior", bg=COR_AZUL_ESCURO, fg=COR_BRANCA,
+                                      relief=tk.FLAT, command=lambda: self.mostrar_pagina(self.pagina_atual - 1))
+        self.btn_anterior.pack(side=tk.LEFT, padx=5)
 
-        df_base = pd.merge(
-            df_cartesian,
-            alunos_com_matricula.drop(columns=['Escola_Key']),
-            on='Matricula',
-            how='left'
-        )
+        self.pagina_label = tk.Label(navegacao, text="", bg=COR_CINZA_CLARO, font=FONTE_PRINCIPAL)
+        self.pagina_label.pack(side=tk.LEFT, padx=5)
 
-        self.df_presenca_completa = pd.merge(
-            df_base,
-            df_presenca_nomes[['Aluno_Normalized', 'Oficina', 'Data_Oficina', 'Presenca']],
-            on=['Aluno_Normalized', 'Oficina'],
-            how='left'
-        )
+        self.btn_proxima = tk.Button(navegacao, text="Próxima >", bg=COR_AZUL_ESCURO, fg=COR_BRANCA,
+                                     relief=tk.FLAT, command=lambda: self.mostrar_pagina(self.pagina_atual + 1))
+        self.btn_proxima.pack(side=tk.LEFT, padx=5)
 
-        self.df_presenca_completa['Presenca'] = self.df_presenca_completa['Presenca'].fillna(0)
-        self.df_presenca_completa['Data_Oficina'] = self.df_presenca_completa['Data_Oficina'].fillna('')
+        self.mostrar_pagina(0)
 
-        return self.df_presenca_completa
+    def exibir(self, resultado):
+        """Troca o resultado exibido e volta para a primeira página."""
+        self.resultado = resultado
+        self.mostrar_pagina(0)
 
-    def load_data(self):
-        """Ponto de entrada para carregar todos os dados."""
-        if not os.path.exists(PLANILHA_TRILHAS) or not os.path.exists(PLANILHA_PRESENCA):
-            self.error_message = ERRO_ARQUIVO_NAO_ENCONTRADO
-            self.is_loaded = False
-            return
+    def exibir_mensagem(self, texto):
+        self.exibir(ResultadoPaginado(texto))
 
-        try:
-            self.df_alunos = self._load_trilhas_formativas()
-            alunos_validos = self.df_alunos[self.df_alunos['Aluno_Normalized'] != ''].copy()
-            df_completo = self._load_presenca_trilhas(alunos_validos)
+    def mostrar_pagina(self, numero):
+        numero = min(max(numero, 0), self.resultado.total_paginas - 1)
+        self.pagina_atual = numero
 
-            if df_completo.empty and not self.df_alunos.empty:
-                self.error_message = "Dados cadastrais carregados, mas a unificação de presença falhou (ou não há registros de presença)."
-                self.is_loaded = True
-                return
-            elif df_completo.empty and self.df_alunos.empty:
-                self.error_message = "Nenhum dado cadastral ou de presença carregado."
-                self.is_loaded = False
-                return
-
-            self.df_presenca_completa = df_completo
-            self.is_loaded = True
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, self.resultado.pagina(numero))
 
-        except Exception as e:
-            self.error_message = f"{ERRO_DADOS}\nDetalhe do erro: {e}"
-            self.is_loaded = False
-            print(f"Erro fatal no carregamento de dados: {e}")
+        total = self.resultado.total_paginas
+        self.pagina_label.config(text=f"Página {numero + 1} de {total}")
+        self.btn_anterior.config(state=tk.NORMAL if numero > 0 else tk.DISABLED)
+        self.btn_proxima.config(state=tk.NORMAL if numero < total - 1 else tk.DISABLED)
 
 
 # DEFINIÇÃO DAS CLASSES DE TELAS
@@ -236,9 +182,7 @@ class MenuFrame(tk.Frame):
 
         try:
             # Carrega a imagem de fundo (usando o caminho configurado em Const.py)
-            img = Image.open(IMAGEM_FUNDO)
-            img = img.resize((JANELA_LARGURA, JANELA_ALTURA), Image.LANCZOS)
-            self.bg_image = ImageTk.PhotoImage(img)
+            self.bg_image = carregar_imagem_fundo(IMAGEM_FUNDO, JANELA_LARGURA, JANELA_ALTURA)
 
             bg_label = tk.Label(self, image=self.bg_image)
             bg_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -246,12 +190,27 @@ class MenuFrame(tk.Frame):
         except FileNotFoundError:
             tk.Label(self, text="Arquivo de imagem de fundo não encontrado.", font=FONTE_TITULO,
                      bg=COR_CINZA_CLARO).pack(pady=20)
+        except ImportError:
+            tk.Label(self, text="Instale o Pillow (pip install Pillow) para exibir a imagem de fundo.",
+                     font=FONTE_TITULO, bg=COR_CINZA_CLARO).pack(pady=20)
         except Exception as e:
             tk.Label(self, text=f"Erro ao carregar imagem.", font=FONTE_TITULO, bg=COR_CINZA_CLARO).pack(pady=20)
 
         title = tk.Label(self, text="Análise de Trilhas Formativas", font=('Helvetica', 18, 'bold'), bg=COR_CINZA_CLARO)
         title.pack(pady=40)
 
+        # Escolha do período (só aparece quando há mais de um, ver mostrar_periodos)
+        self.periodo_frame = tk.Frame(self, bg=COR_CINZA_CLARO)
+        tk.Label(self.periodo_frame, text="Período:", bg=COR_CINZA_CLARO,
+                 font=FONTE_PRINCIPAL).pack(side=tk.LEFT, padx=5)
+        self.periodo_var = tk.StringVar(self)
+        self.periodo_menu = ttk.Combobox(self.periodo_frame, textvariable=self.periodo_var, state="readonly",
+                                         font=FONTE_PRINCIPAL, width=15)
+        self.periodo_menu.pack(side=tk.LEFT, padx=5)
+        self.periodo_menu.bind('<<ComboboxSelected>>',
+                               lambda event: controller.selecionar_periodo(self.periodo_var.get()))
+        self.title_label = title
+
         btn_busca = create_menu_button(self, "Busca de Dados Cadastrais",
                                        lambda: controller.show_frame("DadosAlunosFrame"))
         btn_busca.pack(pady=10)
@@ -260,11 +219,136 @@ class MenuFrame(tk.Frame):
                                             lambda: controller.show_frame("PorcentagensFrame"))
         btn_frequencia.pack(pady=10)
 
+        btn_analise = create_menu_button(self, "Análise Geral de Frequência",
+                                         lambda: controller.show_frame("AnaliseFrame"))
+        btn_analise.pack(pady=10)
+
+        self.btn_recarregar = create_menu_button(self, "Recarregar Dados", controller.recarregar_dados)
+        self.btn_recarregar.pack(pady=10)
+
         btn_sair = create_menu_button(self, "Sair", controller.quit)
         btn_sair.pack(pady=10)
 
+        # Andamento do carregamento das planilhas (feito em segundo plano)
+        self.status_label = tk.Label(self, text="Carregando planilhas...", font=FONTE_PRINCIPAL, bg=COR_CINZA_CLARO)
+        self.status_label.pack(pady=(20, 5))
+
+        self.progress_bar = ttk.Progressbar(self, orient=tk.HORIZONTAL, length=300, mode='determinate', maximum=100)
+        self.progress_bar.pack()
+
+    def mostrar_periodos(self, periodos, atual):
+        self.periodo_menu.config(values=periodos)
+        self.periodo_var.set(atual)
+        if len(periodos) > 1:
+            self.periodo_frame.pack(after=self.title_label, pady=(0, 10))
+
+    def iniciar_progresso(self, texto):
+        self.status_label.config(text=texto)
+        self.progress_bar['value'] = 0
+        self.progress_bar.pack()
+        self.btn_recarregar.config(state=tk.DISABLED)
+        self.periodo_menu.config(state=tk.DISABLED)
+
+    def atualizar_progresso(self, texto, percentual):
+        self.status_label.config(text=texto)
+        self.progress_bar['value'] = percentual
+
+    def finalizar_progresso(self, texto):
+        self.status_label.config(text=texto)
+        self.progress_bar.pack_forget()
+        self.btn_recarregar.config(state=tk.NORMAL)
+        self.periodo_menu.config(state="readonly")
+
+
+class BuscaFrame(tk.Frame):
+    """
+    Base das telas de busca: pesquisa ao clicar em "Pesquisar", ao teclar Enter e, com BUSCA_AO_DIGITAR,
+    enquanto se digita (só depois de ATRASO_BUSCA_DIGITACAO_MS sem novas teclas).
+    As buscas rodam em segundo plano; as que forem superadas por uma busca mais nova são descartadas.
+    """
+
+    def configurar_busca(self, search_by_menu):
+        self.busca_atual = 0
+        self.busca_agendada = None
+        self.ultima_busca = None  # (search_by, search_value, resultado), reaproveitada quando o termo cresce
+        self.ultimo_termo = None
+
+        self.search_entry.bind('<Return>', lambda event: self.perform_search())
+        if BUSCA_AO_DIGITAR:
+            self.search_entry.bind('<KeyRelease>', self.agendar_busca)
+            search_by_menu.bind('<<ComboboxSelected>>', self.agendar_busca)
+
+    def habilitar_busca(self):
+        self.search_button.config(state=tk.NORMAL)
+
+    def desabilitar_busca(self):
+        self.search_button.config(state=tk.DISABLED)
+        # Os dados vão ser recarregados: resultados antigos não servem mais de ponto de partida,
+        # e uma busca ainda em andamento (sobre os dados antigos) é descartada ao terminar
+        self.ultima_busca = None
+        self.ultimo_termo = None
+        self.busca_atual += 1
+
+    def agendar_busca(self, event=None):
+        """Reinicia a contagem a cada tecla; a busca só roda quando o usuário para de digitar."""
+        if self.busca_agendada is not None:
+            self.after_cancel(self.busca_agendada)
+        self.busca_agendada = self.after(ATRASO_BUSCA_DIGITACAO_MS, self.busca_ao_digitar)
+
+    def busca_ao_digitar(self):
+        self.busca_agendada = None
+        if str(self.search_button['state']) == tk.DISABLED:
+            return
+
+        termo = (self.search_by_var.get(), self.search_entry.get().strip())
+        if termo == self.ultimo_termo:  # Teclas que não mudaram o texto (setas, Shift...)
+            return
+
+        if len(termo[1]) < CARACTERES_MINIMOS_BUSCA_DIGITACAO:
+            self.ultimo_termo = termo
+            self.busca_atual += 1  # Descarta buscas ainda em andamento
+            self.resultados.exibir_mensagem("")
+            return
+
+        self.perform_search()
+
+    def iniciar_busca(self, search_by, search_value, tarefa):
+        """
+        Roda `tarefa(anterior, cancelada)` em segundo plano e exibe o ResultadoPaginado devolvido.
+        `anterior` é a última busca concluída (ver DataLoader._reaproveita) e `cancelada()` indica que
+        uma busca mais nova já começou, para que a tarefa possa parar no meio.
+        """
+        if self.busca_agendada is not None:
+            self.after_cancel(self.busca_agendada)
+            self.busca_agendada = None
+
+        self.ultimo_termo = (search_by, search_value)
+        self.busca_atual += 1
+        busca = self.busca_atual
+        anterior = self.ultima_busca
+
+        # Enquanto se digita, o resultado anterior continua na tela até o novo ficar pronto
+        if anterior is None:
+            self.resultados.exibir_mensagem("Pesquisando...")
+
+        def cancelada():
+            return busca != self.busca_atual
+
+        def concluir(resultado, erro):
+            if cancelada():
+                return
+            if erro is not None:
+                self.resultados.exibir_mensagem(f"Ocorreu um erro inesperado durante a pesquisa: {erro}")
+                print(f"Erro na busca: {erro}")
+                return
+            resultado_paginado, dados = resultado
+            self.ultima_busca = (search_by, search_value, dados)
+            self.resultados.exibir(resultado_paginado)
 
-class PorcentagensFrame(tk.Frame):
+        executar_em_segundo_plano(self, lambda: tarefa(anterior, cancelada), concluir)
+
+
+class PorcentagensFrame(BuscaFrame):
     def __init__(self, parent, controller):
         tk.Frame.__init__(self, parent, bg=COR_CINZA_CLARO)
         self.controller = controller
@@ -288,94 +372,89 @@ class PorcentagensFrame(tk.Frame):
 
         self.search_entry = tk.Entry(input_frame, width=30, font=FONTE_PRINCIPAL)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.configurar_busca(search_by_menu)
 
-        tk.Button(input_frame, text="Pesquisar", command=self.perform_search, bg=COR_AZUL_ESCURO, fg=COR_BRANCA,
-                  relief=tk.FLAT).pack(side=tk.LEFT, padx=10)
+        # Fica desabilitado até os dados terminarem de carregar
+        self.search_button = tk.Button(input_frame, text="Pesquisar", command=self.perform_search, bg=COR_AZUL_ESCURO,
+                                       fg=COR_BRANCA, relief=tk.FLAT, state=tk.DISABLED)
+        self.search_button.pack(side=tk.LEFT, padx=10)
 
-        # Área de Resultados
-        self.results_text = tk.Text(self, wrap=tk.WORD, width=70, height=25, font=FONTE_PRINCIPAL, bg=COR_BRANCA)
-        self.results_text.pack(pady=10, padx=20)
+        # Área de Resultados (paginada)
+        self.resultados = ResultadosPaginados(self)
+        self.resultados.pack(pady=10, padx=20)
 
         # Botão de retorno
         btn_voltar = create_menu_button(self, "Voltar ao Menu", lambda: controller.show_frame("MenuFrame"))
         btn_voltar.pack(pady=10)
 
-    def calculate_percentage(self, df_filtered, search_value):
+    def calculate_percentage(self, df_alunos_filtrados, df_oficinas_filtradas, search_value, search_by):
         """
         Calcula a frequência por oficina para um aluno (ou todos os alunos da oficina).
+        O cálculo em si fica em DataLoader.calcular_frequencia; aqui só é montado o ResultadoPaginado.
+        Não usa widgets, pois roda fora da thread do Tk (ver perform_search).
         """
+        if df_alunos_filtrados.empty or df_oficinas_filtradas.empty:
+            return ResultadoPaginado(f"Nenhum registro encontrado para '{search_value}'.")
 
-        self.results_text.delete(1.0, tk.END)
-
-        if df_filtered.empty:
-            self.results_text.insert(tk.END, f"Nenhum registro encontrado para '{search_value}'.")
-            return
-
-        df = df_filtered.copy()
-
-        # Agrupa por Matricula e Oficina para somar as presenças e contar os dias totais únicos
-        df_group = df.groupby(['Matricula', 'Oficina', 'Dias_Totais_Oficina']).agg(
-            Presencas_Contadas=('Presenca', 'sum'),
-            Aluno=('Aluno', 'first'),
-            Escola=('Escola', 'first')
-        ).reset_index()
-
-        df_group['Frequencia_Percentual'] = (
-                    df_group['Presencas_Contadas'] / df_group['Dias_Totais_Oficina'] * 100).replace([np.inf, -np.inf],
-                                                                                                    0).round(1)
-
-        output = ""
+        data_loader = self.controller.data_loader
+        df_group = data_loader.calcular_frequencia(df_alunos_filtrados, df_oficinas_filtradas)
 
         # Se a busca for por Aluno ou Matrícula
-        if self.search_by_var.get() in ["Aluno", "Matricula"]:
+        if search_by in ["Aluno", "Matricula"]:
             if df_group.empty:
-                output += f"Nenhuma frequência de oficina registrada para '{search_value}'."
-            else:
-                aluno_info = df_group.iloc[0]
-                output += f"--- Detalhes do Aluno: {aluno_info['Aluno']} ---\n"
-                output += f"Escola: {aluno_info['Escola']}\n"
-                output += f"Matrícula: {aluno_info['Matricula']}\n\n"
-                output += "--- Frequência em Oficinas ---\n"
-
-                for index, row in df_group.iterrows():
-                    output += f"Oficina: {row['Oficina']} | Presença: {int(row['Presencas_Contadas'])}/{int(row['Dias_Totais_Oficina'])} ({row['Frequencia_Percentual']}%)"
-
-                    dias_presentes = df[(df['Matricula'] == row['Matricula']) & (df['Oficina'] == row['Oficina']) & (
-                                df['Presenca'] == 1)]['Data_Oficina'].unique()
-                    if len(dias_presentes) > 0:
-                        output += f"\nDias Presentes: {', '.join(dias_presentes)}\n"
-                    else:
-                        output += "\nDias Presentes: Nenhum dia registrado\n"
+                return ResultadoPaginado(f"Nenhuma frequência de oficina registrada para '{search_value}'.")
+
+            aluno_info = df_group.iloc[0]
+            cabecalho = (f"--- Detalhes do Aluno: {aluno_info['Aluno']} ---\n"
+                         f"Escola: {aluno_info['Escola']}\n"
+                         f"Matrícula: {aluno_info['Matricula']}\n\n")
+
+            def formatar_oficinas(inicio, fim):
+                output = []
+                for row in df_group.iloc[inicio:fim].to_dict('records'):
+                    dias_presentes = row['Dias_Presentes']
+                    dias = ', '.join(dias_presentes) if len(dias_presentes) > 0 else "Nenhum dia registrado"
+                    output.append(f"Oficina: {row['Oficina']} | Presença: {int(row['Presencas_Contadas'])}/{int(row['Dias_Totais_Oficina'])} ({row['Frequencia_Percentual']}%)"
+                                  f"\nDias Presentes: {dias}\n")
+                return ''.join(output)
+
+            return ResultadoPaginado(cabecalho, [
+                ("--- Frequência em Oficinas ---\n", len(df_group), formatar_oficinas)
+            ])
 
         # Se a busca for por Oficina
-        elif self.search_by_var.get() == "Oficina":
-            oficina_nome = df_group.iloc[0]['Oficina']
-            dias_totais = df_group.iloc[0]['Dias_Totais_Oficina']
+        oficina_nome = df_group.iloc[0]['Oficina']
+        dias_totais = df_group.iloc[0]['Dias_Totais_Oficina']
 
-            output += f"--- Detalhes da Oficina: {oficina_nome} ---\n"
-            output += f"Dias Totais da Oficina (Configurados): {dias_totais}\n\n"
-            output += "--- Frequência Individual dos Alunos ---\n"
+        cabecalho = (f"--- Detalhes da Oficina: {oficina_nome} ---\n"
+                     f"Dias Totais da Oficina (Configurados): {dias_totais}\n\n")
 
-            for index, row in df_group.iterrows():
-                output += f"Aluno: {row['Aluno']} (Escola: {row['Escola']}) | Frequência: {int(row['Presencas_Contadas'])}/{int(row['Dias_Totais_Oficina'])} ({row['Frequencia_Percentual']}%) \n"
+        def formatar_alunos(inicio, fim):
+            return ''.join(
+                f"Aluno: {row['Aluno']} (Escola: {row['Escola']}) | Frequência: {int(row['Presencas_Contadas'])}/{int(row['Dias_Totais_Oficina'])} ({row['Frequencia_Percentual']}%) \n"
+                for row in df_group.iloc[inicio:fim].to_dict('records')
+            )
 
-            output += "\n--- Alunos Presentes por Dia (LISTA COMPLETA) ---\n"
+        # Todos os nomes de cada data, sem limite (uma data por item da página)
+        presentes_por_data = list(data_loader.presentes_por_data(df_oficinas_filtradas['Oficina']).items())
 
-            df_presenca_por_dia = df[df['Presenca'] == 1].groupby('Data_Oficina').agg(
-                presentes=('Aluno', list),
-                count=('Aluno', 'count')
-            ).reset_index()
+        def formatar_datas(inicio, fim):
+            return ''.join(
+                f"Data {data} ({len(presentes)} presentes)\n" + ", ".join(presentes) + "\n"
+                for data, presentes in presentes_por_data[inicio:fim]
+            )
 
-            # Exibe todos os nomes, sem limite.
-            for index, row in df_presenca_por_dia.iterrows():
-                output += f"Data {row['Data_Oficina']} ({row['count']} presentes)\n"
-                output += ", ".join(row['presentes'])
-                output += "\n"
-
-        self.results_text.insert(tk.END, output)
+        return ResultadoPaginado(cabecalho, [
+            ("--- Frequência Individual dos Alunos ---\n", len(df_group), formatar_alunos),
+            ("\n--- Alunos Presentes por Dia (LISTA COMPLETA) ---\n", len(presentes_por_data), formatar_datas)
+        ])
 
     def perform_search(self):
-        """Executa a busca e chama o cálculo de frequência."""
+        """Executa a busca e o cálculo de frequência em segundo plano e exibe a primeira página do resultado."""
+        # O <Return> do campo de busca chama este método mesmo com o botão desabilitado (dados ainda carregando)
+        if str(self.search_button['state']) == tk.DISABLED:
+            return
+
         search_value = self.search_entry.get().strip()
         search_by = self.search_by_var.get()
 
@@ -383,34 +462,24 @@ class PorcentagensFrame(tk.Frame):
             messagebox.showwarning("Aviso", "Por favor, insira um valor para pesquisa.")
             return
 
-        df_completo = self.controller.data_loader.df_presenca_completa
+        data_loader = self.controller.data_loader
 
-        if df_completo.empty:
-            self.results_text.insert(tk.END, "Erro: Nenhum dado de presença carregado.")
+        if not data_loader.has_presenca():
+            self.resultados.exibir_mensagem("Erro: Nenhum dado de presença carregado.")
             return
 
-        normalized_search = normalize_text(search_value)
-        df_filtered = pd.DataFrame()
+        def tarefa(anterior, cancelada):
+            filtrados = data_loader.filtrar_frequencia(search_by, search_value, anterior)
+            if cancelada():
+                return None, None
+            resultado = self.calculate_percentage(*filtrados, search_value, search_by)
+            resultado.pagina(0)  # Formata a primeira página ainda fora da thread do Tk
+            return resultado, filtrados
 
-        try:
-            if search_by == "Aluno":
-                df_filtered = df_completo[
-                    df_completo['Aluno_Normalized'].str.contains(normalized_search, na=False)].copy()
-            elif search_by == "Matricula":
-                df_filtered = df_completo[
-                    df_completo['Matricula'].astype(str).str.contains(normalized_search, na=False, case=False)].copy()
-            elif search_by == "Oficina":
-                df_filtered = df_completo[
-                    df_completo['Oficina'].str.contains(search_value, na=False, case=False)].copy()
-
-            self.calculate_percentage(df_filtered, search_value)
-
-        except Exception as e:
-            self.results_text.insert(tk.END, f"Ocorreu um erro inesperado durante a pesquisa: {e}")
-            print(f"Erro na busca/cálculo de frequência: {e}")
+        self.iniciar_busca(search_by, search_value, tarefa)
 
 
-class DadosAlunosFrame(tk.Frame):
+class DadosAlunosFrame(BuscaFrame):
     def __init__(self, parent, controller):
         tk.Frame.__init__(self, parent, bg=COR_CINZA_CLARO)
         self.controller = controller
@@ -434,73 +503,273 @@ class DadosAlunosFrame(tk.Frame):
 
         self.search_entry = tk.Entry(input_frame, width=30, font=FONTE_PRINCIPAL)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.configurar_busca(search_by_menu)
 
-        tk.Button(input_frame, text="Pesquisar", command=self.perform_search, bg=COR_AZUL_ESCURO, fg=COR_BRANCA,
-                  relief=tk.FLAT).pack(side=tk.LEFT, padx=10)
+        # Fica desabilitado até os dados terminarem de carregar
+        self.search_button = tk.Button(input_frame, text="Pesquisar", command=self.perform_search, bg=COR_AZUL_ESCURO,
+                                       fg=COR_BRANCA, relief=tk.FLAT, state=tk.DISABLED)
+        self.search_button.pack(side=tk.LEFT, padx=10)
 
-        # Área de Resultados
-        self.results_text = tk.Text(self, wrap=tk.WORD, width=70, height=25, font=FONTE_PRINCIPAL, bg=COR_BRANCA)
-        self.results_text.pack(pady=10, padx=20)
+        # Área de Resultados (paginada)
+        self.resultados = ResultadosPaginados(self)
+        self.resultados.pack(pady=10, padx=20)
 
         # Botão de retorno
         btn_voltar = create_menu_button(self, "Voltar ao Menu", lambda: controller.show_frame("MenuFrame"))
         btn_voltar.pack(pady=10)
 
+    @staticmethod
+    def montar_resultado(df_filtered, search_by, search_value):
+        """Monta o ResultadoPaginado da busca cadastral; cada página formata só os seus alunos."""
+        if df_filtered.empty:
+            return ResultadoPaginado(f"Nenhum aluno encontrado para '{search_value}' no campo '{search_by}'.")
+
+        campos = [field for field in CAMPOS_EXIBICAO_DADOS if field in df_filtered.columns]
+
+        def formatar_alunos(inicio, fim):
+            pagina = df_filtered.iloc[inicio:fim]
+            output = []
+            for index, row in zip(pagina.index, pagina.to_dict('records')):
+                output.append(f"--- Aluno {index + 1} (Matrícula: {row['Matricula']})---\n")
+                output.extend(f"{field}: {row[field]}\n" for field in campos)
+                output.append("\n")
+            return ''.join(output)
+
+        return ResultadoPaginado(f"--- Encontrados {len(df_filtered)} alunos com '{search_value}' ---\n\n", [
+            ("", len(df_filtered), formatar_alunos)
+        ])
+
     def perform_search(self):
-        """Executa a busca de dados cadastrais."""
+        """Executa a busca de dados cadastrais em segundo plano e exibe a primeira página do resultado."""
+        if str(self.search_button['state']) == tk.DISABLED:
+            return
+
         search_value = self.search_entry.get().strip()
         search_by = self.search_by_var.get()
 
-        self.results_text.delete(1.0, tk.END)
-
         if not search_value:
+            self.resultados.exibir_mensagem("")
             messagebox.showwarning("Aviso", "Por favor, insira um valor para pesquisa.")
             return
 
-        df_alunos = self.controller.data_loader.df_alunos
+        data_loader = self.controller.data_loader
 
-        if df_alunos.empty:
-            self.results_text.insert(tk.END, "Erro: Nenhum dado cadastral carregado.")
+        if data_loader.df_alunos.empty:
+            self.resultados.exibir_mensagem("Erro: Nenhum dado cadastral carregado.")
             return
 
-        normalized_search = normalize_text(search_value)
-        df_filtered = pd.DataFrame()
+        def tarefa(anterior, cancelada):
+            df_filtered = data_loader.buscar_alunos(search_by, search_value, anterior)
+            if cancelada():
+                return None, None
+            resultado = self.montar_resultado(df_filtered, search_by, search_value)
+            resultado.pagina(0)  # Formata a primeira página ainda fora da thread do Tk
+            return resultado, df_filtered
+
+        self.iniciar_busca(search_by, search_value, tarefa)
+
+class AnaliseFrame(tk.Frame):
+    """
+    Indicadores gerais (analise.AnaliseFrequencia): médias por escola e por oficina, distribuição das frequências,
+    alunos abaixo do limite e comparecimento por data. O cálculo roda em segundo plano e o relatório pode ser exportado.
+    """
+
+    def __init__(self, parent, controller):
+        tk.Frame.__init__(self, parent, bg=COR_CINZA_CLARO)
+        self.controller = controller
+        self.analise = None
+        self.calculo_atual = 0
+
+        label = tk.Label(self, text="Análise Geral de Frequência", font=FONTE_TITULO, bg=COR_CINZA_CLARO)
+        label.pack(pady=10)
+
+        input_frame = tk.Frame(self, bg=COR_CINZA_CLARO)
+        input_frame.pack(pady=10)
+
+        tk.Label(input_frame, text="Alunos abaixo de (%):", bg=COR_CINZA_CLARO,
+                 font=FONTE_PRINCIPAL).pack(side=tk.LEFT, padx=5)
+
+        self.limite_entry = tk.Entry(input_frame, width=8, font=FONTE_PRINCIPAL)
+        self.limite_entry.insert(0, f"{LIMITE_FREQUENCIA_RISCO:g}")
+        self.limite_entry.pack(side=tk.LEFT, padx=5)
+        self.limite_entry.bind('<Return>', lambda event: self.calcular())
+
+        # Fica desabilitado até as listas de presença terminarem de carregar
+        self.search_button = tk.Button(input_frame, text="Calcular", command=self.calcular, bg=COR_AZUL_ESCURO,
+                                       fg=COR_BRANCA, relief=tk.FLAT, state=tk.DISABLED)
+        self.search_button.pack(side=tk.LEFT, padx=10)
+
+        self.export_button = tk.Button(input_frame, text="Exportar", command=self.exportar, bg=COR_AZUL_ESCURO,
+                                       fg=COR_BRANCA, relief=tk.FLAT, state=tk.DISABLED)
+        self.export_button.pack(side=tk.LEFT, padx=5)
+
+        # Um arquivo por escola (exportacao.py); não depende do cálculo da análise, só das listas de presença
+        self.escolas_button = tk.Button(input_frame, text="Exportar por Escola", command=self.exportar_por_escola,
+                                        bg=COR_AZUL_ESCURO, fg=COR_BRANCA, relief=tk.FLAT, state=tk.DISABLED)
+        self.escolas_button.pack(side=tk.LEFT, padx=5)
+
+        # Área de Resultados (paginada)
+        self.resultados = ResultadosPaginados(self)
+        self.resultados.pack(pady=10, padx=20)
+
+        # Botão de retorno
+        btn_voltar = create_menu_button(self, "Voltar ao Menu", lambda: controller.show_frame("MenuFrame"))
+        btn_voltar.pack(pady=10)
+
+    def habilitar_busca(self):
+        self.search_button.config(state=tk.NORMAL)
+        self.escolas_button.config(state=tk.NORMAL)
+
+    def desabilitar_busca(self):
+        self.search_button.config(state=tk.DISABLED)
+        self.export_button.config(state=tk.DISABLED)
+        self.escolas_button.config(state=tk.DISABLED)
+        # A análise anterior é dos dados que vão ser recarregados
+        self.analise = None
+        self.calculo_atual += 1
+
+    @staticmethod
+    def montar_resultado(analise):
+        """Monta o ResultadoPaginado com todos os indicadores; cada página formata só as suas linhas."""
+
+        def formatar_agregado(df, coluna):
+            def formatar(inicio, fim):
+                return ''.join(
+                    f"{row[coluna]}: média {row['Frequencia_Media']}% | mediana {row['Frequencia_Mediana']}% | "
+                    f"geral {row['Frequencia_Geral']}% | {row['Alunos']} alunos, "
+                    f"{row['Alunos_Abaixo_Limite']} abaixo do limite ({row['Percentual_Abaixo_Limite']}%)\n"
+                    for row in df.iloc[inicio:fim].to_dict('records'))
+            return formatar
+
+        def formatar_distribuicao(inicio, fim):
+            return ''.join(f"{row['Faixa']}: {row['Participacoes']} ({row['Percentual']}%)\n"
+                           for row in analise.distribuicao.iloc[inicio:fim].to_dict('records'))
+
+        def formatar_risco(inicio, fim):
+            return ''.join(
+                f"{row['Aluno']} (Matrícula: {row['Matricula']}, {row['Escola']}) - {row['Oficina']}: "
+                f"{row['Frequencia_Percentual']}% ({row['Presencas_Contadas']} de {row['Dias_Totais_Oficina']} dias)\n"
+                for row in analise.alunos_em_risco.iloc[inicio:fim].to_dict('records'))
+
+        def formatar_comparecimento(inicio, fim):
+            return ''.join(
+                f"{row['Oficina']} - {row['Data_Oficina']}: {row['Presentes']} presentes "
+                f"({row['Percentual_Participantes']}% dos participantes)\n"
+                for row in analise.comparecimento.iloc[inicio:fim].to_dict('records'))
+
+        cabecalho = (f"--- {len(analise.participacoes)} participações (aluno x oficina com presença); "
+                     f"limite de {analise.limite:g}% ---\n")
+        return ResultadoPaginado(cabecalho, [
+            ("\n--- Por Escola ---\n", len(analise.por_escola), formatar_agregado(analise.por_escola, 'Escola')),
+            ("\n--- Por Oficina ---\n", len(analise.por_oficina), formatar_agregado(analise.por_oficina, 'Oficina')),
+            ("\n--- Distribuição das Frequências ---\n", len(analise.distribuicao), formatar_distribuicao),
+            (f"\n--- Alunos Abaixo de {analise.limite:g}% ({len(analise.alunos_em_risco)}) ---\n",
+             len(analise.alunos_em_risco), formatar_risco),
+            ("\n--- Comparecimento por Data ---\n", len(analise.comparecimento), formatar_comparecimento),
+        ])
+
+    def calcular(self):
+        """Calcula os indicadores em segundo plano e exibe a primeira página."""
+        if str(self.search_button['state']) == tk.DISABLED:
+            return
 
         try:
-            if search_by == "Aluno":
-                df_filtered = df_alunos[df_alunos['Aluno_Normalized'].str.contains(normalized_search, na=False)].copy()
-            elif search_by == "Escola":
-                df_filtered = df_alunos[
-                    df_alunos['Escola_Key'].str.contains(normalized_search, na=False, case=False)].copy()
-            else:
-                df_filtered = df_alunos[
-                    df_alunos[search_by].astype(str).apply(normalize_text).str.contains(normalized_search,
-                                                                                        na=False)].copy()
+            limite = float(self.limite_entry.get().replace(',', '.'))
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe o limite de frequência como um número (ex.: 75).")
+            return
+
+        data_loader = self.controller.data_loader
+        if not data_loader.has_presenca():
+            self.resultados.exibir_mensagem("Erro: Nenhum dado de presença carregado.")
+            return
+
+        self.calculo_atual += 1
+        calculo = self.calculo_atual
+        self.export_button.config(state=tk.DISABLED)
+        self.resultados.exibir_mensagem("Calculando...")
 
-            if df_filtered.empty:
-                self.results_text.insert(tk.END,
-                                         f"Nenhum aluno encontrado para '{search_value}' no campo '{search_by}'.")
+        def tarefa():
+            from analise import AnaliseFrequencia
+            analise = AnaliseFrequencia(data_loader, limite)
+            resultado = self.montar_resultado(analise)
+            resultado.pagina(0)  # Formata a primeira página ainda fora da thread do Tk
+            return analise, resultado
+
+        def concluir(resultado, erro):
+            if calculo != self.calculo_atual:
+                return
+            if erro is not None:
+                self.resultados.exibir_mensagem(f"Ocorreu um erro inesperado durante a análise: {erro}")
+                print(f"Erro na análise: {erro}")
                 return
+            self.analise, resultado_paginado = resultado
+            self.resultados.exibir(resultado_paginado)
+            self.export_button.config(state=tk.NORMAL)
 
-            output = f"--- Encontrados {len(df_filtered)} alunos com '{search_value}' ---\n\n"
-            fields_to_show = ["Aluno", "Matricula", "CPF", "Mae", "Pai", "Turma", "Telefone", "Escola", "Direcao"]
+        executar_em_segundo_plano(self, tarefa, concluir)
 
-            for index, row in df_filtered.iterrows():
-                output += f"--- Aluno {index + 1} (Matrícula: {row['Matricula']})---\n"
-                for field in fields_to_show:
-                    if field in row:
-                        output += f"{field}: {row[field]}\n"
-                output += "\n"
+    def exportar(self):
+        """Grava o relatório da última análise (.xlsx com uma aba por indicador, ou um .csv por indicador)."""
+        if self.analise is None:
+            return
 
-            self.results_text.insert(tk.END, output)
+        caminho = filedialog.asksaveasfilename(
+            parent=self, title="Exportar análise", defaultextension=".xlsx", initialfile="analise_frequencia.xlsx",
+            filetypes=[("Planilha do Excel", "*.xlsx"), ("CSV (um arquivo por indicador)", "*.csv")])
+        if not caminho:
+            return
 
+        try:
+            gravados = self.analise.exportar(caminho)
         except Exception as e:
-            self.results_text.insert(tk.END, f"Ocorreu um erro inesperado durante a pesquisa: {e}")
-            print(f"Erro na busca de dados cadastrais: {e}")
+            messagebox.showerror("Erro", f"Não foi possível exportar a análise: {e}")
+            return
+        messagebox.showinfo("Exportação", "Relatório gravado em:\n" + "\n".join(gravados))
+
+    def exportar_por_escola(self):
+        """Grava em segundo plano um .xlsx por escola (frequência e resumo por aluno) na pasta escolhida."""
+        if str(self.escolas_button['state']) == tk.DISABLED:
+            return
+
+        try:
+            limite = float(self.limite_entry.get().replace(',', '.'))
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe o limite de frequência como um número (ex.: 75).")
+            return
+
+        pasta = filedialog.askdirectory(parent=self, title="Pasta para os arquivos por escola")
+        if not pasta:
+            return
+
+        data_loader = self.controller.data_loader
+        self.escolas_button.config(state=tk.DISABLED, text="Exportando...")
+
+        def tarefa():
+            from exportacao import exportar_por_escola
+            return exportar_por_escola(data_loader, pasta, 'xlsx', limite)
+
+        def concluir(gravados, erro):
+            self.escolas_button.config(text="Exportar por Escola")
+            if data_loader is self.controller.data_loader and self.controller.presenca_pronta:
+                self.escolas_button.config(state=tk.NORMAL)
+            if erro is not None:
+                messagebox.showerror("Erro", f"Não foi possível exportar os arquivos por escola: {erro}")
+                print(f"Erro na exportação por escola: {erro}")
+                return
+            messagebox.showinfo("Exportação", f"{len(gravados)} arquivos gravados em:\n{pasta}")
+
+        executar_em_segundo_plano(self, tarefa, concluir)
 
 # CLASSE PRINCIPAL DA APLICAÇÃO
 
 class App(tk.Tk):
+    # Telas criadas na primeira vez em que são abertas (ver show_frame)
+    TELAS = {"MenuFrame": MenuFrame, "PorcentagensFrame": PorcentagensFrame, "DadosAlunosFrame": DadosAlunosFrame,
+             "AnaliseFrame": AnaliseFrame}
+    # Telas que dependem das listas de presença (lidas na primeira vez em que uma delas é aberta)
+    TELAS_PRESENCA = ("PorcentagensFrame", "AnaliseFrame")
+
     def __init__(self, *args, **kwargs):
         # GARANTE A INICIALIZAÇÃO DA CLASSE TK
         tk.Tk.__init__(self, *args, **kwargs)
@@ -508,33 +777,198 @@ class App(tk.Tk):
         self.geometry(f"{JANELA_LARGURA}x{JANELA_ALTURA}")
         self.resizable(False, False)
 
-        # Carregador de Dados
-        self.data_loader = DataLoader()
-        self.data_loader.load_data()
+        # Períodos e carregador de dados do período aberto: criados na thread de carregamento,
+        # junto com a importação do pandas (ver _carregar_dados)
+        self.catalogo = None
+        self.data_loader = None
+        self.fila_carregamento = queue.Queue()
+        self.carregando = False
+        self.carga_inclui_presenca = False
+        self.tempo_primeira_janela = None
+        # Situação dos dados para as telas de busca (ver _atualizar_buscas)
+        self.cadastro_pronto = False
+        self.presenca_pronta = False
+        # A planilha de presença só é lida depois que a tela de frequência é aberta (CARREGAR_PRESENCA_SOB_DEMANDA)
+        self.presenca_solicitada = not CARREGAR_PRESENCA_SOB_DEMANDA
 
         # Container de Frames
-        container = tk.Frame(self)
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = tk.Frame(self)
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
         self.frames = {}
-        # Inicialização dos frames (janelas da aplicação)
-        for F in (MenuFrame, PorcentagensFrame, DadosAlunosFrame):
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         self.show_frame("MenuFrame")
 
+        # As planilhas só começam a ser lidas depois que o menu aparece
+        self.after_idle(self._janela_exibida)
+
+        if MONITORAR_PLANILHAS:
+            self.after(INTERVALO_MONITORAMENTO_MS, self._monitorar_planilhas)
+
+    def _janela_exibida(self):
+        self.update_idletasks()
+        self.tempo_primeira_janela = time.perf_counter() - INICIO_PROGRAMA
+        print(f"Janela exibida em {self.tempo_primeira_janela:.2f} s.")
+        self._iniciar_carregamento("Carregando planilhas...")
+
+    def _iniciar_carregamento(self, texto, somente_presenca=False):
+        """
+        Dispara o carregamento (ou recarregamento) em segundo plano, bloqueando as buscas até o fim.
+        Com `somente_presenca`, lê só as listas de presença sobre o cadastro já carregado.
+        """
+        if self.carregando:
+            return
+        self.carregando = True
+        self.carga_inclui_presenca = somente_presenca or self.presenca_solicitada
+        if not somente_presenca:
+            self.cadastro_pronto = False
+        self.presenca_pronta = False
+
+        self.frames["MenuFrame"].iniciar_progresso(texto)
+        self._atualizar_buscas()
+        if self.carga_inclui_presenca:
+            for page_name in self.TELAS_PRESENCA:
+                if page_name in self.frames:
+                    self.frames[page_name].resultados.exibir_mensagem("Carregando listas de presença...")
+
+        threading.Thread(target=self._carregar_dados, args=(somente_presenca, self.presenca_solicitada),
+                         daemon=True).start()
+        self.after(INTERVALO_VERIFICACAO_MS, self._verificar_carregamento)
+
+    def recarregar_dados(self):
+        """Relê as planilhas; apenas as abas alteradas desde a última carga são processadas de novo."""
+        self._iniciar_carregamento("Recarregando planilhas...")
+
+    def selecionar_periodo(self, periodo):
+        """Troca o período aberto; um período já carregado e sem alterações nas planilhas não é relido."""
+        if self.carregando or self.catalogo is None or periodo == self.data_loader.periodo:
+            return
+
+        self.data_loader = self.catalogo.carregador(periodo)
+        self.cadastro_pronto = self.presenca_pronta = False
+        self._atualizar_buscas()
+        for page_name, frame in self.frames.items():
+            if page_name != "MenuFrame":
+                frame.resultados.exibir_mensagem("")
+
+        if self.data_loader.atualizado() and (self.data_loader.presenca_carregada or not self.presenca_solicitada):
+            self.carga_inclui_presenca = self.data_loader.presenca_carregada
+            self._finalizar_carregamento()
+        else:
+            self._iniciar_carregamento(f"Carregando o período {periodo}...")
+
+    def _monitorar_planilhas(self):
+        """Verifica periodicamente se as planilhas do período aberto foram salvas e, nesse caso, recarrega."""
+        if (not self.carregando and self.data_loader is not None
+                and self.data_loader.assinatura_planilhas() != self.data_loader.assinatura_carregada):
+            self.recarregar_dados()
+
+        self.after(INTERVALO_MONITORAMENTO_MS, self._monitorar_planilhas)
+
+    def _carregar_dados(self, somente_presenca, incluir_presenca):
+        """Roda na thread de carregamento; só conversa com a interface através da fila."""
+        def progresso(evento, texto, percentual):
+            self.fila_carregamento.put((evento, texto, percentual))
+
+        if self.catalogo is None:
+            try:
+                from data_loader import CatalogoPeriodos
+            except ImportError as e:
+                progresso('erro_importacao', f"Não foi possível carregar a camada de dados (data_loader.py): {e}", 0)
+                return
+            self.catalogo = CatalogoPeriodos()
+            self.data_loader = self.catalogo.carregador(self.catalogo.atual())
+            progresso('periodos', "", 0)
+
+        if somente_presenca:
+            self.data_loader.carregar_presenca(progresso=progresso)
+        else:
+            self.data_loader.load_data(progresso=progresso, incluir_presenca=incluir_presenca)
+        progresso('concluido', "", 100)
+
+    def _verificar_carregamento(self):
+        """Consome a fila de carregamento no loop do Tk e atualiza a interface."""
+        menu = self.frames["MenuFrame"]
+
+        while True:
+            try:
+                evento, texto, percentual = self.fila_carregamento.get_nowait()
+            except queue.Empty:
+                break
+
+            if evento == 'planilha':
+                menu.atualizar_progresso(texto, percentual)
+            elif evento == 'alunos_prontos':
+                menu.atualizar_progresso(texto, percentual)
+                self.cadastro_pronto = True
+                self._atualizar_buscas()
+            elif evento == 'periodos':
+                menu.mostrar_periodos(self.catalogo.periodos, self.data_loader.periodo)
+            elif evento == 'erro_importacao':
+                messagebox.showerror("Erro de Dependência", texto)
+                self.destroy()
+                return
+            elif evento == 'concluido':
+                self._finalizar_carregamento()
+                return
+
+        self.after(INTERVALO_VERIFICACAO_MS, self._verificar_carregamento)
+
+    def _finalizar_carregamento(self):
+        menu = self.frames["MenuFrame"]
+        self.carregando = False
+
         # Exibe o status do carregamento
         if not self.data_loader.is_loaded:
+            menu.finalizar_progresso("Falha ao carregar os dados.")
             messagebox.showwarning("Aviso",
                                    "A interface abriu, mas o carregamento dos dados falhou. Verifique os arquivos Excel.")
+            return
+
+        abas_relidas = sum(len(abas) for abas in self.data_loader.abas_relidas.values())
+        texto = f"Dados carregados ({abas_relidas} aba(s) lida(s) do Excel)."
+        if self.catalogo.particionado:
+            texto = f"Período {self.data_loader.periodo}: {texto[0].lower()}{texto[1:]}"
+        menu.finalizar_progresso(texto)
+        self.cadastro_pronto = not self.data_loader.df_alunos.empty
+        self.presenca_pronta = self.data_loader.has_presenca()
+        self._atualizar_buscas()
+
+        if self.carga_inclui_presenca:
+            for page_name in self.TELAS_PRESENCA:
+                if page_name in self.frames:
+                    self.frames[page_name].resultados.exibir_mensagem(
+                        "" if self.presenca_pronta else
+                        self.data_loader.error_message or "Erro: Nenhum dado de presença carregado.")
+
+        # Uma tela de frequência foi aberta durante a carga só do cadastro
+        if self.presenca_solicitada and not self.carga_inclui_presenca:
+            self._iniciar_carregamento("Carregando listas de presença...", somente_presenca=True)
+
+    def _atualizar_buscas(self):
+        """Habilita a busca das telas já criadas conforme os dados disponíveis."""
+        for page_name, frame in self.frames.items():
+            if page_name == "MenuFrame":
+                continue
+            if self.presenca_pronta if page_name in self.TELAS_PRESENCA else self.cadastro_pronto:
+                frame.habilitar_busca()
+            else:
+                frame.desabilitar_busca()
 
     def show_frame(self, page_name):
-        frame = self.frames[page_name]
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = self.TELAS[page_name](parent=self.container, controller=self)
+            self.frames[page_name] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+            self._atualizar_buscas()
+
+        if page_name in self.TELAS_PRESENCA and not self.presenca_solicitada:
+            self.presenca_solicitada = True
+            if not self.carregando and self.data_loader is not None and self.data_loader.is_loaded:
+                self._iniciar_carregamento("Carregando listas de presença...", somente_presenca=True)
+
         frame.tkraise()
 
     def quit(self):
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from analise import AnaliseFrequencia
+from data_loader import DataLoader, datas_reais
+
+# Cabeçalhos de data do Excel chegam como texto ISO; dias até 12 são os que o dayfirst trocaria pelo mês
+ROTULOS = ['2025-03-10 00:00:00', '2025-03-03 00:00:00', '2025-04-01 00:00:00', '2025-03-31 00:00:00']
+
+
+def test_datas_reais_le_rotulos_iso_sem_trocar_dia_e_mes():
+    datas = datas_reais(pd.Series(ROTULOS + ['10/03/2025', 'Observações']))
+
+    esperado = pd.to_datetime(['2025-03-10', '2025-03-03', '2025-04-01', '2025-03-31', '2025-03-10'])
+    assert list(datas.iloc[:5]) == list(esperado)
+    assert pd.isna(datas.iloc[5])
+
+
+def test_comparecimento_ordena_pelas_datas_reais():
+    presenca = pd.DataFrame({
+        'Matricula': ['M1', 'M2', 'M1', 'M1', 'M2', 'M2'],
+        'Oficina': ['Robotica'] * 6,
+        'Data_Oficina': [ROTULOS[0], ROTULOS[0], ROTULOS[1], ROTULOS[2], ROTULOS[2], ROTULOS[3]],
+    })
+    presenca['Data'] = datas_reais(presenca['Data_Oficina'])
+
+    data_loader = DataLoader()
+    data_loader.df_presenca_completa = presenca
+    por_oficina = pd.DataFrame({'Oficina': ['Robotica'], 'Alunos': [2]})
+
+    comparecimento = AnaliseFrequencia._comparecimento(data_loader.comparecimento_por_data(), por_oficina)
+
+    assert list(comparecimento['Data'].dt.strftime('%Y-%m-%d')) == [
+        '2025-03-03', '2025-03-10', '2025-03-31', '2025-04-01']
+    assert list(comparecimento['Presentes']) == [1, 2, 1, 2]
+    assert list(comparecimento['Percentual_Participantes']) == [50.0, 100.0, 50.0, 100.0]
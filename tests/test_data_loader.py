@@ -0,0 +1,98 @@
+import os
+import shutil
+import zipfile
+
+import pandas as pd
+from openpyxl import Workbook
+
+from data_loader import CacheDados, DataLoader, aba_do_cache, aba_para_cache, assinaturas_abas
+
+# Lista de presença de exemplo do repositório (gravada pelo Excel, com os nomes em xl/sharedStrings.xml)
+PRESENCA_EXEMPLO = os.path.join(os.path.dirname(__file__), os.pardir, 'dados', 'lista_presenca_trilhas_formativas.xlsx')
+
+
+def criar_planilhas(pasta):
+    cadastro = Workbook()
+    aba = cadastro.active
+    aba.title = 'escola_central'
+    aba.append(['Aluno', 'Matricula', 'CPF'])
+    aba.append(['CARINA DE SOUZA', 'M1', '11122233344'])
+    caminho_cadastro = os.path.join(pasta, 'trilhas.xlsx')
+    cadastro.save(caminho_cadastro)
+
+    caminho_presenca = os.path.join(pasta, 'presenca.xlsx')
+    shutil.copy(PRESENCA_EXEMPLO, caminho_presenca)
+    return caminho_cadastro, caminho_presenca
+
+
+def trocar_texto_compartilhado(caminho, antigo, novo):
+    """Reescreve o .xlsx trocando um texto só no xl/sharedStrings.xml (o XML das abas fica idêntico)."""
+    with zipfile.ZipFile(caminho) as arquivo:
+        partes = [(info, arquivo.read(info.filename)) for info in arquivo.infolist()]
+    with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as arquivo:
+        for info, conteudo in partes:
+            if info.filename == 'xl/sharedStrings.xml':
+                assert antigo.encode() in conteudo
+                conteudo = conteudo.replace(antigo.encode(), novo.encode())
+            arquivo.writestr(info, conteudo)
+
+
+def nomes_lidos(data_loader):
+    """Nomes de todas as abas de presença, como foram lidos do Excel (antes da conciliação com o cadastro)."""
+    return {str(nome) for _, resultado in data_loader.abas['presenca'].values() if resultado is not None
+            for nome in resultado[2]}
+
+
+def test_recarga_le_de_novo_as_abas_quando_so_o_shared_strings_muda(tmp_path):
+    cadastro, presenca = criar_planilhas(tmp_path)
+    pasta_cache = str(tmp_path / 'cache')
+    data_loader = DataLoader(cadastro, presenca, pasta_cache=pasta_cache)
+    data_loader.load_data()
+    assert 'CARINA DE SOUZA' in nomes_lidos(data_loader)
+
+    assinaturas = assinaturas_abas(presenca)
+    trocar_texto_compartilhado(presenca, 'CARINA DE SOUZA', 'CARINA DE SOUSA')
+    assert all(assinaturas_abas(presenca)[aba] != assinatura for aba, assinatura in assinaturas.items())
+
+    data_loader.load_data()
+    assert data_loader.abas_relidas['presenca'] == list(assinaturas)
+    assert 'CARINA DE SOUSA' in nomes_lidos(data_loader)
+    assert 'CARINA DE SOUZA' not in nomes_lidos(data_loader)
+
+    # O cache em disco foi regravado com as novas assinaturas: uma nova sessão não relê o Excel nem vê o nome antigo
+    nova_sessao = DataLoader(cadastro, presenca, pasta_cache=pasta_cache)
+    nova_sessao.load_data()
+    assert nova_sessao.abas_relidas['presenca'] == []
+    assert 'CARINA DE SOUSA' in nomes_lidos(nova_sessao)
+    assert 'CARINA DE SOUZA' not in nomes_lidos(nova_sessao)
+
+
+def test_cache_guarda_cadastro_com_tipos_misturados(tmp_path, capsys):
+    cadastro, presenca = criar_planilhas(tmp_path)
+    workbook = Workbook()
+    aba = workbook.active
+    aba.title = 'escola_central'
+    aba.append(['Aluno', 'Matricula', 'CPF'])
+    aba.append(['CARINA DE SOUZA', 12345, 1234567890])
+    aba.append(['JOAO PEREIRA', 'A-77', '123.456.789-01'])
+    aba.append(['MARIA LIMA', 'M3', None])
+    workbook.save(cadastro)
+
+    df = pd.read_excel(cadastro)
+    cache = CacheDados(str(tmp_path / 'cache'))
+    cache.salvar('trilhas', 'escola_central', 'assinatura', *aba_para_cache('trilhas', df))
+    relido = aba_do_cache('trilhas', *cache.carregar('trilhas', 'escola_central', 'assinatura'))
+    assert list(relido.columns) == list(df.columns)
+    assert list(relido['Matricula']) == [12345, 'A-77', 'M3']
+    assert [type(valor) for valor in relido['CPF'].iloc[:2]] == [int, str]
+    assert pd.isna(relido['CPF'].iloc[2])
+
+    pasta_cache = str(tmp_path / 'cache_carga')
+    DataLoader(cadastro, presenca, pasta_cache=pasta_cache).load_data()
+    assert "Não foi possível gravar o cache" not in capsys.readouterr().out
+
+    data_loader = DataLoader(cadastro, presenca, pasta_cache=pasta_cache)
+    data_loader.load_data()
+    assert data_loader.abas_relidas['trilhas'] == []
+    assert set(data_loader.df_alunos['Matricula']) == {'12345', 'A-77', 'M3'}
+    assert set(data_loader._colunas_busca()['CPF']) == {'01234567890', '12345678901', ''}